@@ -4,7 +4,9 @@
 BSC靓号生成器 Web管理后端
 """
 
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Response, render_template, request, jsonify, send_file
+from werkzeug.exceptions import HTTPException
+from werkzeug.wsgi import wrap_file
 from flask_socketio import SocketIO, emit
 from flask_cors import CORS
 import paramiko
@@ -13,6 +15,14 @@ import time
 import os
 import json
 import io
+import re
+import glob
+import uuid
+import zlib
+import struct
+import bisect
+import hashlib
+import tarfile
 from datetime import datetime
 
 app = Flask(__name__, 
@@ -29,6 +39,26 @@ task_status = {}
 # 存储活动任务 {task_id: {'ssh': ssh_obj, 'stop_flag': threading.Event()}}
 active_tasks = {}
 
+# 生成器结果格式 -> 文件扩展名
+RESULT_EXTENSIONS = {'text': 'txt', 'jsonl': 'jsonl', 'csv': 'csv'}
+
+# 连接测试中检测CPU拓扑的超时（秒）
+TOPOLOGY_TIMEOUT = 10
+
+# 生成过程中增量同步结果文件的间隔（秒）
+RESULT_SYNC_INTERVAL = 2.0
+
+# 任务结束时通过WebSocket推送的结果预览上限（完整结果请下载）
+RESULT_PREVIEW_BYTES = 8 * 1024
+
+# 导出归档时每次读取的块大小
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+# 停止任务: 每隔 STOP_SIGNAL_INTERVAL 秒向任务的进程组重发SIGTERM，
+# 超过 STOP_GRACE_SECONDS 仍未退出则改发SIGKILL
+STOP_SIGNAL_INTERVAL = 0.5
+STOP_GRACE_SECONDS = 5.0
+
 
 class SSHManager:
     """SSH连接管理器"""
@@ -67,6 +97,25 @@ class SSHManager:
         except Exception as e:
             return None
     
+    def get_cpu_topology(self):
+        """用生成脚本检测可用CPU（亲和性、cgroup配额、物理核心）
+        
+        脚本通过标准输入传给远程python，连接测试不在B端写任何文件；
+        --detect-cpus 不导入依赖，未安装依赖的服务器也能检测
+        """
+        try:
+            local_script = os.path.join(os.path.dirname(__file__), '../bsc_generator/ultra_generator_v2.py')
+            stdin, stdout, stderr = self.client.exec_command(
+                'python3 - --detect-cpus', timeout=TOPOLOGY_TIMEOUT
+            )
+            with open(local_script, 'rb') as f:
+                stdin.write(f.read())
+            stdin.channel.shutdown_write()
+            return json.loads(stdout.read().decode().strip())
+        except Exception:
+            # 超时或解析失败时由调用方回退到nproc
+            return None
+    
     def check_python(self):
         """检查Python版本"""
         try:
@@ -76,12 +125,17 @@ class SSHManager:
         except:
             return None
     
-    def execute_command(self, command, callback=None):
-        """执行命令并实时返回输出"""
+    def execute_command(self, command, callback=None, stop_flag=None, pid_file=None):
+        """执行命令并实时返回输出
+        
+        设置 stop_flag 后向 pid_file 记录的进程组发送停止信号，继续读取输出直到命令退出
+        """
         try:
             transport = self.client.get_transport()
             channel = transport.open_session()
             channel.exec_command(command)
+            stop_requested = None
+            last_signal = 0
             
             while True:
                 if channel.recv_ready():
@@ -96,6 +150,16 @@ class SSHManager:
                 
                 if channel.exit_status_ready():
                     break
+                
+                if stop_flag is not None and pid_file and stop_flag.is_set():
+                    now = time.time()
+                    if stop_requested is None:
+                        stop_requested = now
+                    if now - last_signal >= STOP_SIGNAL_INTERVAL:
+                        # pid文件可能还没写出，所以定期重发
+                        sig = 'TERM' if now - stop_requested < STOP_GRACE_SECONDS else 'KILL'
+                        self.signal_process_group(pid_file, sig)
+                        last_signal = now
                     
                 time.sleep(0.1)
             
@@ -107,15 +171,36 @@ class SSHManager:
                 callback(f"执行错误: {str(e)}\n")
             return False
     
+    def signal_process_group(self, pid_file, sig='TERM'):
+        """向pid文件记录的进程组发送信号（不等待命令结束）"""
+        try:
+            self.client.exec_command(f'kill -{sig} -- -$(cat {pid_file}) 2>/dev/null')
+            return True
+        except Exception:
+            return False
+    
     def upload_file(self, local_path, remote_path):
-        """上传文件到远程服务器"""
+        """上传文件到远程服务器
+        
+        先写临时文件再改名，上传中断不会在目标路径留下残缺文件。
+        """
+        tmp_path = f'{remote_path}.{uuid.uuid4().hex[:8]}.part'
         try:
             sftp = self.client.open_sftp()
-            sftp.put(local_path, remote_path)
-            sftp.close()
+        except Exception:
+            return False
+        try:
+            sftp.put(local_path, tmp_path)
+            sftp.posix_rename(tmp_path, remote_path)
             return True
-        except Exception as e:
+        except Exception:
+            try:
+                sftp.remove(tmp_path)
+            except Exception:
+                pass
             return False
+        finally:
+            sftp.close()
     
     def download_file(self, remote_path, local_path):
         """从远程服务器下载文件"""
@@ -127,6 +212,41 @@ class SSHManager:
         except Exception as e:
             return False
     
+    def tail_file(self, remote_path, local_path, offset=0):
+        """把远程文件从offset开始新增的内容追加到本地文件，返回新的偏移量"""
+        try:
+            sftp = self.client.open_sftp()
+            try:
+                size = sftp.stat(remote_path).st_size
+                if size > offset:
+                    with sftp.open(remote_path, 'rb') as remote, open(local_path, 'ab') as local:
+                        remote.seek(offset)
+                        remote.prefetch(size - offset)
+                        while offset < size:
+                            chunk = remote.read(min(32768, size - offset))
+                            if not chunk:
+                                break
+                            local.write(chunk)
+                            offset += len(chunk)
+            finally:
+                sftp.close()
+        except (IOError, paramiko.SSHException):
+            # 文件尚未创建或连接中断，下次再同步
+            pass
+        return offset
+    
+    def file_exists(self, remote_path):
+        """远程文件是否存在（空文件也算存在）"""
+        try:
+            sftp = self.client.open_sftp()
+            try:
+                sftp.stat(remote_path)
+                return True
+            finally:
+                sftp.close()
+        except (IOError, paramiko.SSHException):
+            return False
+    
     def close(self):
         """关闭连接"""
         if self.client:
@@ -134,6 +254,22 @@ class SSHManager:
             self.connected = False
 
 
+def find_generator_bundle():
+    """查找本地构建的生成器zipapp（bsc_generator/dist/ 下最新的一个）
+    
+    比 ultra_generator_v2.py 旧的包不包含脚本的最新改动，忽略并改用脚本
+    """
+    generator_dir = os.path.join(os.path.dirname(__file__), '../bsc_generator')
+    bundles = glob.glob(os.path.join(generator_dir, 'dist/ultra_generator_v2-*.pyz'))
+    if not bundles:
+        return None
+    bundle = max(bundles, key=os.path.getmtime)
+    script = os.path.join(generator_dir, 'ultra_generator_v2.py')
+    if os.path.exists(script) and os.path.getmtime(bundle) < os.path.getmtime(script):
+        return None
+    return bundle
+
+
 @app.route('/')
 def index():
     """主页"""
@@ -159,8 +295,12 @@ def test_connection(data):
         success, message = ssh.connect()
         
         if success:
-            # 获取系统信息
-            cpu_cores = ssh.get_cpu_cores()
+            # 获取系统信息（优先使用实际可用的CPU数，而不是nproc）
+            topology = ssh.get_cpu_topology()
+            if topology:
+                cpu_cores = topology['recommended']
+            else:
+                cpu_cores = ssh.get_cpu_cores()
             python_version = ssh.check_python()
             
             # 获取系统信息
@@ -177,6 +317,7 @@ def test_connection(data):
                 'success': True,
                 'message': message,
                 'cpu_cores': cpu_cores,
+                'cpu_topology': topology,
                 'python_version': python_version,
                 'memory_gb': round(mem_gb, 1),
                 'os_info': os_info
@@ -201,29 +342,10 @@ def stop_task(data):
         task_id = data.get('task_id')
         
         if task_id in active_tasks:
-            task_info = active_tasks[task_id]
-            
-            # 设置停止标志
-            if 'stop_flag' in task_info:
-                task_info['stop_flag'].set()
-            
-            # 关闭SSH连接并终止B端进程
-            if 'ssh' in task_info and task_info['ssh']:
-                try:
-                    ssh = task_info['ssh']
-                    # 在B端服务器上查找并杀死生成进程
-                    stdin, stdout, stderr = ssh.client.exec_command(
-                        "pkill -f 'ultra_generator_v2.py' || true"
-                    )
-                    stdout.channel.recv_exit_status()
-                    ssh.close()
-                except Exception as e:
-                    print(f"停止任务时出错: {e}")
-            
-            # 从活动任务中移除
-            del active_tasks[task_id]
-            
-            emit('task_stopped', {'task_id': task_id, 'message': '任务已停止'})
+            # 只设置停止标志，不在这里等待远程命令：任务线程会向该任务自己的
+            # 进程组发送SIGTERM，生成器保存已找到的地址后退出，其他任务不受影响。
+            # task_stopped 由任务线程在远程进程退出、结果同步完成后发出
+            active_tasks[task_id]['stop_flag'].set()
         else:
             emit('task_error', {'error': '任务不存在或已完成'})
             
@@ -235,7 +357,8 @@ def stop_task(data):
 def start_generation(data):
     """开始生成靓号"""
     try:
-        task_id = f"task_{int(time.time())}"
+        # 同一秒内可能启动多个任务，加随机后缀避免冲突
+        task_id = f"task_{int(time.time())}_{uuid.uuid4().hex[:6]}"
         
         # 提取配置
         host = data.get('host')
@@ -246,16 +369,25 @@ def start_generation(data):
         prefix = data.get('prefix', '')
         suffix = data.get('suffix', '')
         contains = data.get('contains', '')
+        pattern = data.get('pattern', '')
+        score = data.get('score', '')
+        time_budget = data.get('time_budget', '10m')
         case_sensitive = data.get('case_sensitive', False)
         wallet_count = data.get('wallet_count', 1)
         cpu_cores = data.get('cpu_cores', 4)
+        auto_tune = data.get('auto_tune', False)
+        profile = data.get('profile', False)
+        result_format = data.get('result_format', 'text')
+        if result_format not in RESULT_EXTENSIONS:
+            result_format = 'text'
         
         # 启动生成任务
         thread = threading.Thread(
             target=run_generation_task,
             args=(task_id, host, port, username, password, 
                   prefix, suffix, contains, case_sensitive, 
-                  wallet_count, cpu_cores)
+                  wallet_count, cpu_cores, pattern, score, time_budget,
+                  auto_tune, profile, result_format)
         )
         thread.daemon = True
         thread.start()
@@ -268,7 +400,9 @@ def start_generation(data):
 
 def run_generation_task(task_id, host, port, username, password,
                         prefix, suffix, contains, case_sensitive,
-                        wallet_count, cpu_cores):
+                        wallet_count, cpu_cores, pattern='', score='',
+                        time_budget='10m', auto_tune=False, profile=False,
+                        result_format='text'):
     """运行生成任务（在子线程中）"""
     
     # 注册任务
@@ -309,35 +443,67 @@ def run_generation_task(task_id, host, port, username, password,
         send_output(f"[{datetime.now().strftime('%H:%M:%S')}] 准备工作目录...\n")
         ssh.execute_command('mkdir -p /root/bsc_generator', send_output)
         
-        # 2. 上传生成脚本
-        send_output(f"[{datetime.now().strftime('%H:%M:%S')}] 上传生成脚本...\n")
-        local_script = os.path.join(os.path.dirname(__file__), '../bsc_generator/ultra_generator_v2.py')
-        ssh.upload_file(local_script, '/root/bsc_generator/ultra_generator_v2.py')
-        send_output("✅ 脚本上传完成\n")
-        
-        # 3. 上传requirements.txt
-        send_output(f"[{datetime.now().strftime('%H:%M:%S')}] 上传依赖文件...\n")
-        local_req = os.path.join(os.path.dirname(__file__), '../bsc_generator/requirements.txt')
-        ssh.upload_file(local_req, '/root/bsc_generator/requirements.txt')
-        
-        # 4. 检查并安装依赖
-        send_output(f"[{datetime.now().strftime('%H:%M:%S')}] 检查Python依赖...\n")
-        check_cmd = 'cd /root/bsc_generator && python3 -c "import eth_keys, eth_utils" 2>/dev/null'
-        stdin, stdout, stderr = ssh.client.exec_command(check_cmd)
-        if stdout.channel.recv_exit_status() != 0:
-            send_output("📦 安装依赖包（首次运行需要1-2分钟）...\n")
-            ssh.execute_command(
-                'cd /root/bsc_generator && pip3 install -r requirements.txt -i https://mirrors.aliyun.com/pypi/simple/',
-                send_output
-            )
-        else:
-            send_output("✅ 依赖已安装\n")
+        # 2. 优先使用打包好的zipapp（包含全部依赖，无需pip安装）
+        generator = 'ultra_generator_v2.py'
+        bundle = find_generator_bundle()
+        if bundle:
+            bundle_name = os.path.basename(bundle)
+            remote_bundle = f'/root/bsc_generator/{bundle_name}'
+            # 文件名带版本号和内容摘要：已存在则跳过上传
+            uploaded = False
+            if ssh.file_exists(remote_bundle):
+                send_output(f"✅ 生成器包已存在: {bundle_name}\n")
+            else:
+                send_output(f"[{datetime.now().strftime('%H:%M:%S')}] 上传生成器包 {bundle_name}...\n")
+                uploaded = ssh.upload_file(bundle, remote_bundle)
+            
+            if ssh.file_exists(remote_bundle):
+                stdin, stdout, stderr = ssh.client.exec_command(f'python3 {remote_bundle} --check-deps')
+                if stdout.channel.recv_exit_status() != 0 and not uploaded:
+                    # 已有的包可能损坏（例如旧版本直接上传时被中断），删掉重传一次
+                    send_output("⚠️  已有生成器包无法运行，重新上传...\n")
+                    ssh.execute_command(f'rm -f {remote_bundle}')
+                    if ssh.upload_file(bundle, remote_bundle):
+                        stdin, stdout, stderr = ssh.client.exec_command(f'python3 {remote_bundle} --check-deps')
+                if stdout.channel.recv_exit_status() == 0:
+                    send_output(stdout.read().decode('utf-8', errors='ignore'))
+                    generator = bundle_name
+                else:
+                    send_output("⚠️  生成器包无法在此服务器运行（Python版本或平台不匹配），改用脚本+pip安装\n")
+            else:
+                send_output("⚠️  生成器包上传失败，改用脚本+pip安装\n")
+        
+        if generator == 'ultra_generator_v2.py':
+            # 3. 上传生成脚本
+            send_output(f"[{datetime.now().strftime('%H:%M:%S')}] 上传生成脚本...\n")
+            local_script = os.path.join(os.path.dirname(__file__), '../bsc_generator/ultra_generator_v2.py')
+            ssh.upload_file(local_script, '/root/bsc_generator/ultra_generator_v2.py')
+            send_output("✅ 脚本上传完成\n")
+            
+            # 上传requirements.txt
+            send_output(f"[{datetime.now().strftime('%H:%M:%S')}] 上传依赖文件...\n")
+            local_req = os.path.join(os.path.dirname(__file__), '../bsc_generator/requirements.txt')
+            ssh.upload_file(local_req, '/root/bsc_generator/requirements.txt')
+            
+            # 4. 检查并安装依赖
+            send_output(f"[{datetime.now().strftime('%H:%M:%S')}] 检查Python依赖...\n")
+            check_cmd = 'cd /root/bsc_generator && python3 -c "import eth_keys, eth_utils" 2>/dev/null'
+            stdin, stdout, stderr = ssh.client.exec_command(check_cmd)
+            if stdout.channel.recv_exit_status() != 0:
+                send_output("📦 安装依赖包（首次运行需要1-2分钟）...\n")
+                ssh.execute_command(
+                    'cd /root/bsc_generator && pip3 install -r requirements.txt -i https://mirrors.aliyun.com/pypi/simple/',
+                    send_output
+                )
+            else:
+                send_output("✅ 依赖已安装\n")
         
         # 5. 创建配置文件
         send_output(f"[{datetime.now().strftime('%H:%M:%S')}] 配置生成参数...\n")
         config_content = f"""PREFIX="{prefix}"
 SUFFIX="{suffix}"
 CONTAINS="{contains}"
+PATTERN="{pattern}"
 CASE_SENSITIVE="{case_sensitive}"
 WALLET_COUNT={wallet_count}
 CPU_CORES={cpu_cores}
@@ -354,60 +520,130 @@ CPU_CORES={cpu_cores}
         send_output(f"   前缀: {prefix or '(无)'}\n")
         send_output(f"   后缀: {suffix or '(无)'}\n")
         send_output(f"   包含: {contains or '(无)'}\n")
+        if pattern:
+            send_output(f"   规则: {pattern}\n")
+        if score:
+            send_output(f"   评分: {score} (时间预算 {time_budget})\n")
         send_output(f"   数量: {wallet_count} 个\n")
-        send_output(f"   核心: {cpu_cores} 核\n")
+        send_output(f"   核心: {'自动调优' if auto_tune else f'{cpu_cores} 核'}\n")
         send_output(f"{'='*60}\n\n")
         
         # 6. 运行生成脚本
         send_output(f"[{datetime.now().strftime('%H:%M:%S')}] 🚀 开始生成靓号...\n\n")
         
         # 构建运行命令
-        run_cmd = f'''cd /root/bsc_generator && python3 ultra_generator_v2.py \
+        # 每个任务使用独立的运行目录和进程组，互不影响
+        run_dir = f'/root/bsc_generator/runs/{task_id}'
+        pid_file = f'{run_dir}/generator.pid'
+        run_cmd = f'''mkdir -p {run_dir} && cd {run_dir} && exec python3 /root/bsc_generator/{generator} \
+--pid-file {pid_file} \
 --prefix "{prefix}" \
 --suffix "{suffix}" \
 --contains "{contains}" \
+--pattern "{pattern}" \
 --case-sensitive {str(case_sensitive).lower()} \
 --count {wallet_count} \
---processes {cpu_cores}'''
-        
-        ssh.execute_command(run_cmd, send_output)
-        
-        # 7. 下载结果
-        send_output(f"\n\n[{datetime.now().strftime('%H:%M:%S')}] 📥 下载生成结果...\n")
-        
-        # 确保输出目录存在
+--processes {'auto' if auto_tune else cpu_cores}'''
+        if score:
+            # 评分模式：在时间预算内保留得分最高的 wallet_count 个地址
+            run_cmd += f' --score "{score}" --time-budget "{time_budget}" --top {wallet_count}'
+        if profile:
+            # 采样计时 + 每个进程的cProfile数据
+            run_cmd += ' --profile --profile-dir profile'
+        
+        # 结果文件只追加写入，生成过程中按偏移量增量同步到本地
+        extension = RESULT_EXTENSIONS[result_format]
+        run_cmd += f' --format {result_format}'
+        remote_result = f'{run_dir}/ultra_vanity_wallets.{extension}'
+        result_name = f'wallets_{task_id}.{extension}'
         output_dir = os.path.join(os.path.dirname(__file__), '../output')
         os.makedirs(output_dir, exist_ok=True)
+        local_result = os.path.join(output_dir, result_name)
+        open(local_result, 'wb').close()
+        
+        sync_state = {'offset': 0}
+        generation_done = threading.Event()
+        
+        def sync_results():
+            """生成过程中定期同步结果文件的新增部分"""
+            while not generation_done.wait(RESULT_SYNC_INTERVAL):
+                sync_state['offset'] = ssh.tail_file(remote_result, local_result, sync_state['offset'])
+        
+        def send_generator_output(msg):
+            """转发生成器输出，并上报自动调优选出的进程数"""
+            match = re.search(r'\[CPU_TUNED\] (\d+)', msg)
+            if match:
+                socketio.emit('cpu_tuned', {
+                    'task_id': task_id,
+                    'processes': int(match.group(1))
+                })
+            send_output(msg)
         
-        local_result = os.path.join(output_dir, f'wallets_{task_id}.txt')
-        success = ssh.download_file('/root/bsc_generator/ultra_vanity_wallets.txt', local_result)
+        if stop_flag.is_set():
+            send_output("⏹️  任务在启动前已取消\n")
+            ssh.close()
+            return
+        
+        sync_thread = threading.Thread(target=sync_results)
+        sync_thread.daemon = True
+        sync_thread.start()
+        try:
+            ssh.execute_command(run_cmd, send_generator_output, stop_flag, pid_file)
+        finally:
+            generation_done.set()
+            sync_thread.join()
+        
+        # 7. 同步剩余结果（只传输尚未同步的部分）
+        send_output(f"\n\n[{datetime.now().strftime('%H:%M:%S')}] 📥 下载生成结果...\n")
+        sync_state['offset'] = ssh.tail_file(remote_result, local_result, sync_state['offset'])
+        # 没有命中时结果文件可能为空，以文件是否存在判断
+        success = ssh.file_exists(remote_result)
+        
+        # 下载性能分析报告（没有命中或被停止的任务也有报告，慢机器最需要它）
+        profile_url = None
+        if profile:
+            local_profile = os.path.join(output_dir, f'profile_{task_id}.json')
+            if ssh.download_file(f'{run_dir}/ultra_profile.json', local_profile):
+                profile_url = f'/api/profile/{task_id}'
+                send_output(f"🔬 性能报告: {profile_url}\n")
         
         if success:
-            send_output(f"✅ 结果已保存: wallets_{task_id}.txt\n")
+            send_output(f"✅ 结果已保存: {result_name}\n")
             
-            # 读取并显示结果
-            with open(local_result, 'r', encoding='utf-8') as f:
-                result_content = f.read()
+            # 只推送结果开头部分，避免大结果文件整个经过WebSocket
+            with open(local_result, 'rb') as f:
+                preview = f.read(RESULT_PREVIEW_BYTES)
+            preview = preview.decode('utf-8', errors='ignore')
             
             send_output(f"\n{'='*60}\n")
             send_output(f"📋 生成结果:\n")
             send_output(f"{'='*60}\n")
-            send_output(result_content)
+            if sync_state['offset'] == 0:
+                send_output("📭 没有找到匹配的地址\n")
+            elif sync_state['offset'] > RESULT_PREVIEW_BYTES:
+                # 截断到最后一个完整行
+                preview = preview[:preview.rfind('\n') + 1]
+                send_output(preview)
+                send_output(f"\n... 共 {sync_state['offset'] / 1024:.0f} KB，完整结果请下载文件\n")
+            else:
+                send_output(preview)
             send_output(f"\n{'='*60}\n")
             
-            socketio.emit('task_completed', {
-                'task_id': task_id,
-                'result_file': f'wallets_{task_id}.txt'
-            })
+            # 被停止的任务最后发 task_stopped，不发 task_completed
+            if not stop_flag.is_set():
+                socketio.emit('task_completed', {
+                    'task_id': task_id,
+                    'result_file': result_name,
+                    'profile_url': profile_url
+                })
         else:
             send_output("❌ 下载结果失败\n")
         
         ssh.close()
-        send_output(f"\n[{datetime.now().strftime('%H:%M:%S')}] ✨ 任务完成！\n")
-        
-        # 清理任务
-        if task_id in active_tasks:
-            del active_tasks[task_id]
+        if stop_flag.is_set():
+            send_output(f"\n[{datetime.now().strftime('%H:%M:%S')}] ⏹️  任务已停止\n")
+        else:
+            send_output(f"\n[{datetime.now().strftime('%H:%M:%S')}] ✨ 任务完成！\n")
         
     except Exception as e:
         send_output(f"\n❌ 任务异常: {str(e)}\n")
@@ -415,10 +651,15 @@ CPU_CORES={cpu_cores}
             'task_id': task_id,
             'error': str(e)
         })
-        
+    
+    finally:
         # 清理任务
-        if task_id in active_tasks:
-            del active_tasks[task_id]
+        active_tasks.pop(task_id, None)
+        if stop_flag.is_set():
+            socketio.emit('task_stopped', {
+                'task_id': task_id,
+                'message': '任务已停止'
+            })
 
 
 @app.route('/download/<filename>')
@@ -441,6 +682,260 @@ def download_result(filename):
         return jsonify({'error': str(e)}), 500
 
 
+# ==================== 结果归档导出 ====================
+# 归档内容在下载时按需生成：文件数据直接从磁盘分块读取，不写临时文件，
+# 也不把整个文件读入内存。归档布局只取决于各文件的名称、大小和修改时间，
+# 因此总长度可以预先算出，任意偏移都能定位，从而支持Range断点续传。
+# zip使用不压缩存储 + 数据描述符，CRC在读到对应位置时才计算。
+
+class ArchiveStream:
+    """按需生成的只读zip/tar归档，可seek"""
+    
+    def __init__(self, entries, fmt='zip'):
+        # entries: [(归档内文件名, 本地路径, 大小, 修改时间)]
+        self.entries = entries
+        self.offsets = []
+        self.segments = []
+        self.size = 0
+        self.pos = 0
+        self.crcs = {}
+        self.running_crcs = {}
+        self.cache = {}
+        self.handle = None
+        self.handle_path = None
+        if fmt == 'zip':
+            self._plan_zip()
+        else:
+            self._plan_tar()
+    
+    def _add(self, length, source):
+        """source: bytes、('file', 路径) 或返回bytes的函数（延迟生成）"""
+        if length:
+            self.offsets.append(self.size)
+            self.segments.append((length, source))
+            self.size += length
+    
+    def _plan_tar(self):
+        for name, path, size, mtime in self.entries:
+            info = tarfile.TarInfo(name)
+            info.size = size
+            info.mtime = int(mtime)
+            info.mode = 0o644
+            self._add(tarfile.BLOCKSIZE, info.tobuf(tarfile.USTAR_FORMAT, 'utf-8', 'strict'))
+            self._add(size, ('file', path))
+            self._add(-size % tarfile.BLOCKSIZE, b'\0' * (-size % tarfile.BLOCKSIZE))
+        self._add(tarfile.BLOCKSIZE * 2, b'\0' * (tarfile.BLOCKSIZE * 2))
+    
+    def _plan_zip(self):
+        central = []
+        for name, path, size, mtime in self.entries:
+            encoded = name.encode('utf-8')
+            t = time.localtime(mtime)
+            dos_time = (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+            dos_date = ((max(t.tm_year, 1980) - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+            # 标志位: 0x08 数据描述符（CRC写在数据之后），0x800 文件名为UTF-8
+            header = struct.pack('<4s5H3L2H', b'PK\x03\x04', 20, 0x808, 0, dos_time, dos_date,
+                                 0, 0, 0, len(encoded), 0) + encoded
+            central.append((encoded, path, size, dos_time, dos_date, self.size))
+            self._add(len(header), header)
+            self._add(size, ('file', path))
+            self._add(16, lambda path=path, size=size: struct.pack(
+                '<4s3L', b'PK\x07\x08', self._crc(path, size), size, size))
+        
+        def central_directory():
+            records = []
+            for encoded, path, size, dos_time, dos_date, offset in central:
+                records.append(struct.pack(
+                    '<4s6H3L5H2L', b'PK\x01\x02', 20, 20, 0x808, 0, dos_time, dos_date,
+                    self._crc(path, size), size, size, len(encoded), 0, 0, 0, 0,
+                    0o644 << 16, offset) + encoded)
+            return b''.join(records)
+        
+        directory_size = sum(46 + len(entry[0]) for entry in central)
+        directory_offset = self.size
+        self._add(directory_size, central_directory)
+        self._add(22, struct.pack('<4s4H2LH', b'PK\x05\x06', 0, 0, len(central), len(central),
+                                  directory_size, directory_offset, 0))
+    
+    def _crc(self, path, size):
+        """文件前size字节的CRC32（顺序下载时已在读取过程中算好）"""
+        if path not in self.crcs:
+            crc = 0
+            with open(path, 'rb') as f:
+                remaining = size
+                while remaining:
+                    chunk = f.read(min(EXPORT_CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    crc = zlib.crc32(chunk, crc)
+                    remaining -= len(chunk)
+            self.crcs[path] = crc
+        return self.crcs[path]
+    
+    def _read_file(self, path, start, count, size):
+        if self.handle_path != path:
+            if self.handle:
+                self.handle.close()
+            self.handle = open(path, 'rb')
+            self.handle_path = path
+        self.handle.seek(start)
+        data = self.handle.read(count)
+        if len(data) < count:
+            # 结果文件只追加，不应变短；万一被截断则补零保持归档结构
+            data += b'\0' * (count - len(data))
+        
+        # 从文件开头顺序读取时顺便计算CRC，避免再读一遍
+        if start == 0:
+            self.running_crcs[path] = (0, 0)
+        running = self.running_crcs.get(path)
+        if running and running[0] == start:
+            crc = zlib.crc32(data, running[1])
+            self.running_crcs[path] = (start + len(data), crc)
+            if start + len(data) == size:
+                self.crcs.setdefault(path, crc)
+        return data
+    
+    def read(self, size=-1):
+        """跨段读取，直到读满 size 字节或到达结尾（size<0 时读到结尾）"""
+        if size is None or size < 0:
+            size = self.size - self.pos
+        chunks = []
+        while size > 0 and self.pos < self.size:
+            data = self._read_segment(size)
+            if not data:
+                break
+            chunks.append(data)
+            size -= len(data)
+        return b''.join(chunks)
+    
+    def _read_segment(self, size):
+        """从当前位置读取，不超过当前段的结尾"""
+        index = bisect.bisect_right(self.offsets, self.pos) - 1
+        offset = self.offsets[index]
+        length, source = self.segments[index]
+        start = self.pos - offset
+        count = min(size, length - start)
+        
+        if isinstance(source, tuple):
+            data = self._read_file(source[1], start, count, length)
+        else:
+            if callable(source):
+                if index not in self.cache:
+                    self.cache[index] = source()
+                source = self.cache[index]
+            data = source[start:start + count]
+        self.pos += len(data)
+        return data
+    
+    def seekable(self):
+        return True
+    
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_CUR:
+            offset += self.pos
+        elif whence == os.SEEK_END:
+            offset += self.size
+        self.pos = max(0, offset)
+        return self.pos
+    
+    def tell(self):
+        return self.pos
+    
+    def close(self):
+        if self.handle:
+            self.handle.close()
+            self.handle = None
+            self.handle_path = None
+
+
+def list_result_files(task_ids=None):
+    """列出output目录中的结果文件，返回 [(文件名, 路径, 大小, 修改时间)]"""
+    output_dir = os.path.join(os.path.dirname(__file__), '../output')
+    entries = []
+    for path in sorted(glob.glob(os.path.join(output_dir, 'wallets_task_*'))):
+        name = os.path.basename(path)
+        task_id = os.path.splitext(name)[0][len('wallets_'):]
+        if task_ids is not None and task_id not in task_ids:
+            continue
+        stat = os.stat(path)
+        entries.append((name, path, stat.st_size, stat.st_mtime))
+    return entries
+
+
+@app.route('/api/results')
+def result_list():
+    """列出可下载/导出的结果文件"""
+    return jsonify([
+        {
+            'task_id': os.path.splitext(name)[0][len('wallets_'):],
+            'file': name,
+            'size': size,
+            'modified': datetime.fromtimestamp(mtime).strftime('%Y-%m-%d %H:%M:%S')
+        }
+        for name, path, size, mtime in list_result_files()
+    ])
+
+
+@app.route('/api/export')
+def export_results():
+    """把选中任务的结果打包成zip或tar流式下载，支持Range和条件请求"""
+    try:
+        fmt = request.args.get('format', 'zip')
+        if fmt not in ('zip', 'tar'):
+            return jsonify({'error': '格式只支持 zip 或 tar'}), 400
+        
+        tasks = request.args.get('tasks', '').strip()
+        task_ids = {t.strip() for t in tasks.split(',') if t.strip()} if tasks else None
+        entries = list_result_files(task_ids)
+        if not entries:
+            return jsonify({'error': '没有可导出的结果'}), 404
+        
+        stream = ArchiveStream(entries, fmt)
+        if fmt == 'zip' and (stream.size > 0xFFFFFFFF or len(entries) > 0xFFFF):
+            # 未实现zip64
+            return jsonify({'error': '归档超过4GB或65535个文件，请使用 tar 格式'}), 400
+        
+        # ETag由格式和每个文件的名称、大小、修改时间决定；结果继续追加时自动失效
+        digest = hashlib.sha1(fmt.encode())
+        for name, path, size, mtime in entries:
+            digest.update(f'{name}:{size}:{mtime}\n'.encode())
+        
+        download_name = f"wallets_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+        response = Response(
+            wrap_file(request.environ, stream, EXPORT_CHUNK_SIZE),
+            mimetype='application/zip' if fmt == 'zip' else 'application/x-tar',
+            direct_passthrough=True
+        )
+        response.headers.set('Content-Disposition', 'attachment', filename=download_name)
+        response.content_length = stream.size
+        response.set_etag(digest.hexdigest())
+        response.last_modified = datetime.fromtimestamp(max(entry[3] for entry in entries))
+        return response.make_conditional(request, accept_ranges=True, complete_length=stream.size)
+        
+    except HTTPException:
+        # 416 Range Not Satisfiable 等由werkzeug直接返回
+        raise
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/profile/<task_id>')
+def profile_report(task_id):
+    """获取任务的性能分析报告"""
+    try:
+        output_dir = os.path.join(os.path.dirname(__file__), '../output')
+        file_path = os.path.join(output_dir, f'profile_{os.path.basename(task_id)}.json')
+        
+        if os.path.exists(file_path):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return jsonify(json.load(f))
+        else:
+            return jsonify({'error': '报告不存在'}), 404
+            
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/api/health')
 def health_check():
     """健康检查"""
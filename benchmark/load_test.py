@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Web后端压测 - 多个Socket.IO客户端 + 本地SSH替身
+
+后端作为子进程启动（线程数和内存从 /proc/<pid>/status 采样），
+B端由 ssh_stub.py 模拟，生成器输出速率可调。
+
+用法:
+    python3 load_test.py --tasks 10 --viewers 20 --lines-per-sec 50 --duration 15
+    python3 load_test.py --tasks 20 --json run_b.json --baseline run_a.json
+"""
+
+import os
+import re
+import sys
+import glob
+import json
+import time
+import socket
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+
+import requests
+import socketio
+
+from ssh_stub import SSHStub, StubConfig, TIMESTAMP_MARK
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TIMESTAMP_RE = re.compile(TIMESTAMP_MARK + r'(\d+\.\d+)')
+
+BACKEND_BOOT = (
+    "import sys; sys.path.insert(0, {backend!r}); "
+    "from app import app, socketio; "
+    "socketio.run(app, host='127.0.0.1', port={port}, debug=False, "
+    "allow_unsafe_werkzeug=True, log_output=False)"
+)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def percentiles(values):
+    """p50/p95/p99/max（毫秒）"""
+    if not values:
+        return {'count': 0, 'p50': None, 'p95': None, 'p99': None, 'max': None}
+    values = sorted(values)
+
+    def pick(q):
+        return values[min(len(values) - 1, int(q * len(values)))] * 1000
+
+    return {
+        'count': len(values),
+        'p50': pick(0.50),
+        'p95': pick(0.95),
+        'p99': pick(0.99),
+        'max': values[-1] * 1000,
+    }
+
+
+class ProcessSampler:
+    """定期采样后端进程的线程数和内存"""
+
+    def __init__(self, pid, interval=0.5):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self.stop_event = threading.Event()
+
+    def read(self):
+        info = {}
+        try:
+            with open(f'/proc/{self.pid}/status') as f:
+                for line in f:
+                    key, _, value = line.partition(':')
+                    if key in ('Threads', 'VmRSS'):
+                        info[key] = int(value.split()[0])
+        except OSError:
+            pass
+        return info
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            info = self.read()
+            if info:
+                self.samples.append(info)
+
+    def start(self):
+        thread = threading.Thread(target=self.run)
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def summary(self):
+        self.stop_event.set()
+        threads = [s['Threads'] for s in self.samples if 'Threads' in s]
+        rss = [s['VmRSS'] for s in self.samples if 'VmRSS' in s]
+        final = self.read()
+        return {
+            'threads_max': max(threads) if threads else None,
+            'threads_final': final.get('Threads'),
+            'rss_max_mb': max(rss) / 1024 if rss else None,
+            'rss_final_mb': final.get('VmRSS', 0) / 1024 if final else None,
+        }
+
+
+class Client:
+    """一个Socket.IO客户端：可以驱动任务，也可以只旁观"""
+
+    def __init__(self, url, results):
+        self.url = url
+        self.results = results
+        self.sio = socketio.Client(reconnection=False)
+        self.task_id = None
+        self.started = threading.Event()
+        self.finished = threading.Event()
+        self.connection_done = threading.Event()
+        self.request_time = None
+        self.stop_time = None
+        self.lines = 0
+
+        sio = self.sio
+        sio.on('task_started', self.on_task_started)
+        sio.on('generation_output', self.on_output)
+        sio.on('task_completed', self.on_completed)
+        sio.on('task_stopped', self.on_stopped)
+        sio.on('task_error', self.on_error)
+        sio.on('connection_result', self.on_connection_result)
+
+    def connect(self):
+        self.sio.connect(self.url, wait_timeout=10)
+
+    def on_task_started(self, data):
+        self.task_id = data['task_id']
+        self.results.add('start_latency', time.time() - self.request_time)
+        self.started.set()
+
+    def on_output(self, data):
+        now = time.time()
+        self.results.count_emit()
+        output = data.get('output', '')
+        if data.get('task_id') == self.task_id:
+            self.lines += len(TIMESTAMP_RE.findall(output))
+        for ts in TIMESTAMP_RE.findall(output):
+            self.results.add('output_latency', now - float(ts))
+        # 任务线程结束时总会输出这一行（即使没有结果文件、不发task_completed）
+        if data.get('task_id') == self.task_id and '任务完成' in output:
+            self.finish('failed')
+
+    def finish(self, outcome):
+        if not self.finished.is_set():
+            self.results.count_outcome(outcome)
+            self.finished.set()
+
+    def on_completed(self, data):
+        if data.get('task_id') == self.task_id:
+            self.finish('completed')
+
+    def on_error(self, data):
+        if data.get('task_id') == self.task_id:
+            self.finish('failed')
+
+    def on_stopped(self, data):
+        if data.get('task_id') == self.task_id:
+            self.results.add('stop_latency', time.time() - self.stop_time)
+            self.finish('stopped')
+
+    def on_connection_result(self, data):
+        self.results.add('connection_latency', time.time() - self.request_time)
+        if not data.get('success'):
+            self.results.add_error(data.get('message'))
+        self.connection_done.set()
+
+    def start_task(self, ssh):
+        self.request_time = time.time()
+        self.sio.emit('start_generation', dict(ssh, prefix='888', wallet_count=1, cpu_cores=8))
+
+    def stop_task(self):
+        self.stop_time = time.time()
+        self.sio.emit('stop_task', {'task_id': self.task_id})
+
+    def test_connection(self, ssh):
+        self.request_time = time.time()
+        self.sio.emit('test_connection', ssh)
+
+    def close(self):
+        try:
+            self.sio.disconnect()
+        except Exception:
+            pass
+
+
+class Results:
+    """线程安全的结果收集"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {}
+        self.emits = 0
+        self.outcomes = {'completed': 0, 'stopped': 0, 'failed': 0}
+        self.errors = []
+
+    def add(self, key, value):
+        with self.lock:
+            self.values.setdefault(key, []).append(value)
+
+    def count_emit(self):
+        with self.lock:
+            self.emits += 1
+
+    def count_outcome(self, outcome):
+        with self.lock:
+            self.outcomes[outcome] += 1
+
+    def add_error(self, message):
+        with self.lock:
+            self.errors.append(message)
+
+
+def run_load_test(args):
+    sandbox = tempfile.mkdtemp(prefix='bsc_load_')
+    config = StubConfig(sandbox, cpu_cores=8, lines_per_sec=args.lines_per_sec,
+                        duration=args.duration, line_bytes=args.line_bytes)
+    stub = SSHStub(config).start()
+    ssh = {'host': stub.host, 'port': stub.port, 'username': 'root', 'password': 'stub'}
+
+    port = args.port or free_port()
+    url = f'http://127.0.0.1:{port}'
+    backend = subprocess.Popen(
+        [sys.executable, '-c', BACKEND_BOOT.format(backend=os.path.join(ROOT, 'backend'), port=port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    results = Results()
+    clients = []
+    task_ids = []
+    try:
+        # 等待后端就绪
+        deadline = time.time() + 30
+        while True:
+            try:
+                requests.get(f'{url}/api/health', timeout=1)
+                break
+            except requests.RequestException:
+                if time.time() > deadline or backend.poll() is not None:
+                    raise RuntimeError('后端启动失败')
+                time.sleep(0.2)
+
+        sampler = ProcessSampler(backend.pid).start()
+        idle = sampler.read()
+
+        print(f"🧪 SSH替身 {stub.host}:{stub.port} | 后端 {url} (pid {backend.pid})")
+        print(f"   任务 {args.tasks} | 旁观者 {args.viewers} | 连接测试 {args.connection_tests} | "
+              f"{args.lines_per_sec:g} 行/秒 × {args.duration:g} 秒")
+
+        drivers = [Client(url, results) for _ in range(args.tasks)]
+        viewers = [Client(url, results) for _ in range(args.viewers)]
+        testers = [Client(url, results) for _ in range(args.connection_tests)]
+        clients = drivers + viewers + testers
+        for client in clients:
+            client.connect()
+
+        start = time.time()
+        for client in testers:
+            client.test_connection(ssh)
+        for client in drivers:
+            client.start_task(ssh)
+
+        for client in drivers:
+            if not client.started.wait(30):
+                results.add_error('任务启动超时')
+        task_ids = [c.task_id for c in drivers if c.task_id]
+
+        # 中途停止一部分任务
+        n_stop = int(len(drivers) * args.stop_ratio)
+        if n_stop:
+            time.sleep(args.duration / 2)
+            for client in drivers[:n_stop]:
+                if client.task_id:
+                    client.stop_task()
+
+        timeout = args.duration + 60
+        for client in drivers:
+            if not client.finished.wait(max(0.1, start + timeout - time.time())):
+                results.add_error(f'任务未完成: {client.task_id}')
+        for client in testers:
+            client.connection_done.wait(max(0.1, start + timeout - time.time()))
+        elapsed = time.time() - start
+        
+        # 停止生效延迟: 从客户端发出停止到替身上对应的生成器真正停下
+        stopped = drivers[:n_stop]
+        for client in stopped:
+            cancelled_at = stub.cancellations.get(client.task_id)
+            if cancelled_at is not None:
+                results.add('cancel_latency', cancelled_at - client.stop_time)
+        # 未被停止的任务收到的输出行数占预期的比例（被误停或被拖慢时会下降）
+        expected = args.lines_per_sec * args.duration
+        for client in drivers[n_stop:]:
+            if expected:
+                results.add('untouched_throughput', client.lines / expected)
+
+        process = sampler.summary()
+        process['threads_idle'] = idle.get('Threads')
+        process['rss_idle_mb'] = idle.get('VmRSS', 0) / 1024
+    finally:
+        for client in clients:
+            client.close()
+        backend.terminate()
+        try:
+            backend.wait(5)
+        except subprocess.TimeoutExpired:
+            backend.kill()
+        stub.stop()
+        shutil.rmtree(sandbox, ignore_errors=True)
+        # 清理后端写到 output/ 的结果文件
+        output_dir = os.path.join(ROOT, 'output')
+        for task_id in task_ids:
+            for path in glob.glob(os.path.join(output_dir, f'wallets_{task_id}.*')):
+                os.remove(path)
+        if os.path.isdir(output_dir) and not os.listdir(output_dir):
+            os.rmdir(output_dir)
+
+    return {
+        'config': {
+            'tasks': args.tasks,
+            'viewers': args.viewers,
+            'connection_tests': args.connection_tests,
+            'lines_per_sec': args.lines_per_sec,
+            'duration': args.duration,
+            'line_bytes': args.line_bytes,
+            'stop_ratio': args.stop_ratio,
+        },
+        'elapsed': elapsed,
+        'start_latency_ms': percentiles(results.values.get('start_latency', [])),
+        'output_latency_ms': percentiles(results.values.get('output_latency', [])),
+        'stop_latency_ms': percentiles(results.values.get('stop_latency', [])),
+        'cancel_latency_ms': percentiles(results.values.get('cancel_latency', [])),
+        'connection_latency_ms': percentiles(results.values.get('connection_latency', [])),
+        'tasks': results.outcomes,
+        'untouched_throughput': results.values.get('untouched_throughput', []),
+        'emits_received': results.emits,
+        'emits_per_sec': results.emits / elapsed if elapsed else 0,
+        'process': process,
+        'errors': results.errors,
+    }
+
+
+def print_report(report, baseline=None):
+    def fmt(value):
+        return '-' if value is None else f'{value:.1f}'
+
+    def delta(path):
+        if not baseline:
+            return ''
+        old, new = baseline, report
+        for key in path:
+            old = (old or {}).get(key)
+            new = (new or {}).get(key)
+        if old is None or new is None or old == 0:
+            return ''
+        return f'  ({(new - old) / old * 100:+.0f}%)'
+
+    print()
+    print("=" * 70)
+    print("📊 压测结果")
+    print("=" * 70)
+    for key, label in (('start_latency_ms', '任务启动延迟'),
+                       ('output_latency_ms', '输出端到端延迟'),
+                       ('cancel_latency_ms', '停止生效延迟'),
+                       ('stop_latency_ms', '停止完成延迟'),
+                       ('connection_latency_ms', '连接测试延迟')):
+        st = report[key]
+        print(f"{label:<10s} n={st['count']:<7d} p50={fmt(st['p50']):>8s}  "
+              f"p95={fmt(st['p95']):>8s}  p99={fmt(st['p99']):>8s}  max={fmt(st['max']):>8s} ms"
+              f"{delta((key, 'p95'))}")
+    tasks = report['tasks']
+    print(f"任务结果:   完成 {tasks['completed']} / 停止 {tasks['stopped']} / "
+          f"无结果 {tasks['failed']}（被其他任务的停止操作误杀时会出现）")
+    ratios = report.get('untouched_throughput') or []
+    if ratios:
+        print(f"未停止任务: 输出行数为预期的 {sum(ratios) / len(ratios) * 100:.0f}%"
+              f"（最低 {min(ratios) * 100:.0f}%）")
+    print(f"推送消息:   {report['emits_received']} 条, {report['emits_per_sec']:.0f} 条/秒"
+          f"{delta(('emits_per_sec',))}")
+    proc = report['process']
+    print(f"后端线程:   空闲 {proc['threads_idle']} / 峰值 {proc['threads_max']} / 结束 {proc['threads_final']}"
+          f"{delta(('process', 'threads_max'))}")
+    print(f"后端内存:   空闲 {fmt(proc['rss_idle_mb'])} / 峰值 {fmt(proc['rss_max_mb'])} MB"
+          f"{delta(('process', 'rss_max_mb'))}")
+    if report['errors']:
+        print(f"错误:       {len(report['errors'])} 个，例如 {report['errors'][0]}")
+    print("=" * 70)
+
+
+def check_thresholds(report, args):
+    """按 --max-cancel-ms / --min-untouched 检查结果，返回未通过的说明"""
+    failures = []
+    if args.max_cancel_ms is not None:
+        cancel = report['cancel_latency_ms']
+        if not cancel['count']:
+            failures.append('没有测到停止生效延迟（--stop-ratio 为0或停止未生效）')
+        elif cancel['max'] > args.max_cancel_ms:
+            failures.append(f"停止生效延迟 {cancel['max']:.1f} ms 超过上限 {args.max_cancel_ms:g} ms")
+    if args.min_untouched is not None:
+        ratios = report['untouched_throughput']
+        if not ratios:
+            failures.append('没有未停止的任务，无法检查吞吐量')
+        elif min(ratios) < args.min_untouched:
+            failures.append(f"未停止任务的输出行数最低为预期的 {min(ratios) * 100:.0f}%，"
+                            f"低于 {args.min_untouched * 100:.0f}%")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Web后端压测')
+    parser.add_argument('--tasks', type=int, default=5, help='并发任务数')
+    parser.add_argument('--viewers', type=int, default=5, help='只接收输出的旁观客户端数')
+    parser.add_argument('--connection-tests', type=int, default=2, help='并发的连接测试数')
+    parser.add_argument('--lines-per-sec', type=float, default=20.0, help='每个生成器的输出速率')
+    parser.add_argument('--duration', type=float, default=10.0, help='每个生成器的运行时间（秒）')
+    parser.add_argument('--line-bytes', type=int, default=80, help='每行输出的字节数')
+    parser.add_argument('--stop-ratio', type=float, default=0.2, help='中途停止的任务比例')
+    parser.add_argument('--port', type=int, default=None, help='后端端口（默认随机）')
+    parser.add_argument('--json', type=str, default=None, help='把结果写入JSON文件')
+    parser.add_argument('--baseline', type=str, default=None, help='与之前的JSON结果对比')
+    parser.add_argument('--max-cancel-ms', type=float, default=None,
+                        help='停止生效延迟上限（毫秒），超过时以非零状态退出')
+    parser.add_argument('--min-untouched', type=float, default=None,
+                        help='未停止任务输出行数占预期比例的下限（例如0.95），低于时以非零状态退出')
+    args = parser.parse_args()
+
+    report = run_load_test(args)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 已保存: {args.json}")
+
+    failures = check_thresholds(report, args)
+    for message in failures:
+        print(f"❌ {message}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
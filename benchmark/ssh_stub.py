@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地SSH服务器替身 - 用于后端压测
+
+基于paramiko实现，模拟B端服务器上后端会用到的全部操作:
+- exec: nproc、python3 --version、meminfo、uname、test -f、rm -f、kill、pkill 等
+- SFTP: 上传脚本/生成器包、下载结果文件（映射到本地临时目录）
+- 生成器: 按指定速率输出进度行，每行带发送时间戳，便于客户端计算端到端延迟
+
+单独运行:
+    python3 ssh_stub.py --port 2222 --lines-per-sec 20 --duration 10
+"""
+
+import os
+import re
+import json
+import time
+import logging
+import socket
+import shutil
+import zipfile
+import argparse
+import tempfile
+import threading
+
+import paramiko
+from paramiko import SFTPAttributes, SFTPHandle, SFTPServer, SFTPServerInterface
+from paramiko.sftp import SFTP_OK
+
+
+# 压测结束时客户端会直接断开，不需要paramiko打印连接重置
+logging.getLogger('paramiko').setLevel(logging.CRITICAL)
+
+# 生成器输出中的时间戳标记: ⏱<unix时间>
+TIMESTAMP_MARK = '⏱'
+
+# 假生成器每输出多少行追加一条结果记录
+RESULT_EVERY = 50
+RESULT_EXTENSIONS = {'text': 'txt', 'jsonl': 'jsonl', 'csv': 'csv'}
+
+
+class StubConfig:
+    """替身服务器的行为参数"""
+
+    def __init__(self, root, cpu_cores=8, lines_per_sec=20.0, duration=10.0,
+                 line_bytes=80, progress_ratio=0.9):
+        self.root = root
+        self.cpu_cores = cpu_cores
+        self.lines_per_sec = lines_per_sec
+        self.duration = duration
+        self.line_bytes = line_bytes
+        # 进度行（\r覆盖）占比，其余为普通换行输出
+        self.progress_ratio = progress_ratio
+
+    def local_path(self, path):
+        """把远程绝对路径映射到本地沙箱目录"""
+        path = os.path.normpath('/' + path.lstrip('/'))
+        return os.path.join(self.root, path.lstrip('/'))
+
+
+class StubServer(paramiko.ServerInterface):
+    """接受任意密码，允许session和exec"""
+
+    def __init__(self, stub):
+        self.stub = stub
+
+    def check_auth_password(self, username, password):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def get_allowed_auths(self, username):
+        return 'password'
+
+    def check_channel_request(self, kind, chanid):
+        if kind == 'session':
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_exec_request(self, channel, command):
+        command = command.decode('utf-8', errors='ignore')
+        thread = threading.Thread(target=self.stub.run_command, args=(channel, command))
+        thread.daemon = True
+        thread.start()
+        return True
+
+
+class StubSFTPHandle(SFTPHandle):
+    def stat(self):
+        try:
+            return SFTPAttributes.from_stat(os.fstat(self.readfile.fileno()))
+        except OSError as e:
+            return SFTPServer.convert_errno(e.errno)
+
+
+class StubSFTPServer(SFTPServerInterface):
+    """把SFTP操作映射到本地沙箱目录"""
+
+    def __init__(self, server, *args, **kwargs):
+        super().__init__(server, *args, **kwargs)
+        self.config = server.stub.config
+
+    def _path(self, path):
+        return self.config.local_path(path)
+
+    def open(self, path, flags, attr):
+        local = self._path(path)
+        try:
+            os.makedirs(os.path.dirname(local), exist_ok=True)
+            fd = os.open(local, flags, 0o644)
+        except OSError as e:
+            return SFTPServer.convert_errno(e.errno)
+        if flags & os.O_WRONLY:
+            mode = 'ab' if flags & os.O_APPEND else 'wb'
+        elif flags & os.O_RDWR:
+            mode = 'a+b' if flags & os.O_APPEND else 'r+b'
+        else:
+            mode = 'rb'
+        f = os.fdopen(fd, mode)
+        handle = StubSFTPHandle(flags)
+        handle.filename = local
+        handle.readfile = f
+        handle.writefile = f
+        return handle
+
+    def stat(self, path):
+        try:
+            return SFTPAttributes.from_stat(os.stat(self._path(path)))
+        except OSError as e:
+            return SFTPServer.convert_errno(e.errno)
+
+    lstat = stat
+
+    def list_folder(self, path):
+        local = self._path(path)
+        try:
+            return [SFTPAttributes.from_stat(os.stat(os.path.join(local, name)), name)
+                    for name in os.listdir(local)]
+        except OSError as e:
+            return SFTPServer.convert_errno(e.errno)
+
+    def remove(self, path):
+        try:
+            os.remove(self._path(path))
+        except OSError as e:
+            return SFTPServer.convert_errno(e.errno)
+        return SFTP_OK
+
+    def rename(self, oldpath, newpath):
+        try:
+            os.replace(self._path(oldpath), self._path(newpath))
+        except OSError as e:
+            return SFTPServer.convert_errno(e.errno)
+        return SFTP_OK
+
+    def posix_rename(self, oldpath, newpath):
+        return self.rename(oldpath, newpath)
+
+    def mkdir(self, path, attr):
+        try:
+            os.makedirs(self._path(path), exist_ok=True)
+        except OSError as e:
+            return SFTPServer.convert_errno(e.errno)
+        return SFTP_OK
+
+    def canonicalize(self, path):
+        return os.path.normpath('/' + path.lstrip('/'))
+
+
+class SSHStub:
+    """本地SSH服务器替身"""
+
+    def __init__(self, config, host='127.0.0.1', port=0):
+        self.config = config
+        self.host_key = paramiko.RSAKey.generate(2048)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((host, port))
+        self.sock.listen(100)
+        self.host, self.port = self.sock.getsockname()
+        self.stop_event = threading.Event()
+        # 运行中的假生成器，pkill时全部停止
+        self.generators = set()
+        # 假进程组: 进程组ID -> 停止事件，kill -SIG -- -<pgid> 只停止对应的生成器
+        self.groups = {}
+        self.next_pgid = 10000
+        # 运行目录名（即任务ID） -> 生成器实际停止的时间
+        self.cancellations = {}
+        self.lock = threading.Lock()
+        self.stats = {'connections': 0, 'commands': 0, 'generators': 0}
+
+    def start(self):
+        thread = threading.Thread(target=self._accept_loop)
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        self.sock.close()
+
+    def _accept_loop(self):
+        while not self.stop_event.is_set():
+            try:
+                client, addr = self.sock.accept()
+            except OSError:
+                break
+            thread = threading.Thread(target=self._serve, args=(client,))
+            thread.daemon = True
+            thread.start()
+
+    def _serve(self, client):
+        transport = paramiko.Transport(client)
+        transport.add_server_key(self.host_key)
+        transport.set_subsystem_handler('sftp', SFTPServer, StubSFTPServer)
+        server = StubServer(self)
+        try:
+            transport.start_server(server=server)
+        except (paramiko.SSHException, EOFError):
+            return
+        with self.lock:
+            self.stats['connections'] += 1
+        # 取走已打开的通道并保持引用（Channel被回收时会自动关闭）
+        channels = []
+        while transport.is_active() and not self.stop_event.is_set():
+            channel = transport.accept(1)
+            channels = [c for c in channels if not c.closed]
+            if channel is not None:
+                channels.append(channel)
+
+    # ---------- 命令模拟 ----------
+
+    def run_command(self, channel, command):
+        with self.lock:
+            self.stats['commands'] += 1
+        try:
+            status = self._dispatch(channel, command)
+        except Exception as e:
+            channel.sendall_stderr(f'stub error: {e}\n'.encode())
+            status = 1
+        try:
+            # 只发送EOF，不主动关闭：命令可能在exec请求的应答发出之前就结束了，
+            # 此时关闭通道会让客户端报 "Channel closed"；通道由客户端关闭
+            channel.send_exit_status(status)
+            channel.shutdown_write()
+        except Exception:
+            pass
+
+    def _dispatch(self, channel, command):
+        config = self.config
+        if command.startswith('nproc'):
+            channel.sendall(f'{config.cpu_cores}\n'.encode())
+        elif command.startswith('python3 --version'):
+            channel.sendall(b'Python 3.10.12\n')
+        elif 'meminfo' in command:
+            channel.sendall(b'MemTotal:       16318800 kB\n')
+        elif command.startswith('uname'):
+            channel.sendall(b'Linux stub 5.15.0 #1 SMP x86_64 GNU/Linux\n')
+        elif command.startswith('test -f'):
+            return 0 if os.path.exists(config.local_path(command.split()[-1])) else 1
+        elif command.startswith('rm -f'):
+            for path in command.split()[2:]:
+                try:
+                    os.remove(config.local_path(path))
+                except OSError:
+                    pass
+        elif command.startswith('kill'):
+            # kill -TERM -- -$(cat <pid文件>)
+            match = re.search(r'\$\(cat (\S+)\)', command)
+            try:
+                with open(config.local_path(match.group(1))) as f:
+                    pgid = int(f.read())
+            except (AttributeError, OSError, ValueError):
+                return 1
+            with self.lock:
+                stop = self.groups.get(pgid)
+            if stop is None:
+                return 1
+            stop.set()
+        elif command.startswith('pkill'):
+            with self.lock:
+                generators = list(self.generators)
+            for stop in generators:
+                stop.set()
+        elif '--detect-cpus' in command:
+            topology = {
+                'logical': config.cpu_cores, 'usable': config.cpu_cores,
+                'physical': config.cpu_cores, 'numa_nodes': 1, 'cgroup_quota': None,
+                'recommended': config.cpu_cores, 'order': list(range(config.cpu_cores)),
+            }
+            channel.sendall((json.dumps(topology) + '\n').encode())
+        elif '--check-deps' in command:
+            # 残缺的包不是合法zip，python3运行会失败
+            if not zipfile.is_zipfile(config.local_path(command.split()[1])):
+                return 1
+            channel.sendall('✅ 依赖可用 (stub)\n'.encode())
+        elif 'ultra_generator_v2' in command:
+            return self._fake_generator(channel, command)
+        # mkdir、cat > config.sh、pip3 install、python3 -c import ... 直接成功
+        return 0
+
+    def _fake_generator(self, channel, command):
+        """按配置速率输出，结束时写出结果文件"""
+        config = self.config
+        stop = threading.Event()
+        with self.lock:
+            self.generators.add(stop)
+            self.stats['generators'] += 1
+
+        match = re.search(r'cd (\S+)', command)
+        workdir = config.local_path(match.group(1) if match else '/root/bsc_generator')
+        os.makedirs(workdir, exist_ok=True)
+
+        # 记录假的进程组ID，后端据此只停止这个任务
+        pgid = None
+        match = re.search(r'--pid-file (\S+)', command)
+        if match:
+            with self.lock:
+                pgid = self.next_pgid
+                self.next_pgid += 1
+                self.groups[pgid] = stop
+            with open(config.local_path(match.group(1)), 'w') as f:
+                f.write(f'{pgid}\n')
+        
+        match = re.search(r'--format (\w+)', command)
+        fmt = match.group(1) if match and match.group(1) in RESULT_EXTENSIONS else 'text'
+        result_path = os.path.join(workdir, f'ultra_vanity_wallets.{RESULT_EXTENSIONS[fmt]}')
+        results = open(result_path, 'w', encoding='utf-8')
+        if fmt == 'csv':
+            results.write('index,address,private_key,score,found_at\n')
+        
+        interval = 1.0 / config.lines_per_sec if config.lines_per_sec > 0 else config.duration
+        padding = 'x' * max(0, config.line_bytes - 40)
+        end = time.time() + config.duration
+        next_time = time.time()
+        n = 0
+        try:
+            while time.time() < end and not stop.is_set() and not channel.closed:
+                n += 1
+                now = time.time()
+                if (n % 100) < config.progress_ratio * 100:
+                    line = f'\r[{n:>8d}] {TIMESTAMP_MARK}{now:.6f} {padding}'
+                else:
+                    line = f'\n[{n:>8d}] {TIMESTAMP_MARK}{now:.6f} {padding}\n'
+                channel.sendall(line.encode('utf-8'))
+                if n % RESULT_EVERY == 0:
+                    self._write_result(results, fmt, n // RESULT_EVERY)
+                next_time += interval
+                delay = next_time - time.time()
+                if delay > 0:
+                    stop.wait(delay)
+
+            if stop.is_set():
+                with self.lock:
+                    self.cancellations[os.path.basename(workdir)] = time.time()
+                if pgid is None:
+                    return 143
+                # 收到SIGTERM的真实生成器会保存已找到的地址后正常退出
+                channel.sendall('\n⏹️  已停止\n'.encode('utf-8'))
+                return 0
+            self._write_result(results, fmt, n // RESULT_EVERY + 1)
+            channel.sendall('\n✨ 全部完成！\n'.encode('utf-8'))
+            return 0
+        finally:
+            results.close()
+            with self.lock:
+                self.generators.discard(stop)
+                self.groups.pop(pgid, None)
+
+    @staticmethod
+    def _write_result(results, fmt, index):
+        """按生成器的格式追加一条结果（立即写出，便于后端增量同步）"""
+        address = '0x' + f'{index:040x}'[:-1] + '8'
+        private_key = '0x' + '0' * 64
+        if fmt == 'jsonl':
+            results.write(json.dumps({'index': index, 'address': address, 'private_key': private_key,
+                                      'score': None, 'found_at': time.strftime('%Y-%m-%d %H:%M:%S')}) + '\n')
+        elif fmt == 'csv':
+            results.write(f"{index},{address},{private_key},,{time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+        else:
+            results.write(f'钱包 #{index}\n地址: {address}\n私钥: {private_key}\n\n')
+        results.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地SSH服务器替身')
+    parser.add_argument('--port', type=int, default=2222)
+    parser.add_argument('--cpu-cores', type=int, default=8)
+    parser.add_argument('--lines-per-sec', type=float, default=20.0)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--line-bytes', type=int, default=80)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='ssh_stub_')
+    config = StubConfig(root, args.cpu_cores, args.lines_per_sec, args.duration, args.line_bytes)
+    stub = SSHStub(config, port=args.port).start()
+    print(f"🧪 SSH替身已启动: {stub.host}:{stub.port}  沙箱: {root}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.stop()
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
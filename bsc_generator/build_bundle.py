@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+生成器打包脚本 - 把 ultra_generator_v2.py 及其依赖打成单个 zipapp
+
+B端服务器只需上传一个 .pyz 文件即可运行，无需 pip 安装，也不需要外网。
+
+用法:
+    python3 build_bundle.py                          # 为当前平台打包
+    python3 build_bundle.py --wheels ./wheels        # 使用预先下载的wheel离线打包
+    python3 build_bundle.py --platform manylinux2014_x86_64 --python-version 3.10
+    python3 build_bundle.py --no-deps                # 只打包脚本，使用B端已安装的依赖
+"""
+
+import os
+import re
+import sys
+import time
+import shutil
+import hashlib
+import zipapp
+import argparse
+import tempfile
+import subprocess
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.join(HERE, 'ultra_generator_v2.py')
+REQUIREMENTS = os.path.join(HERE, 'requirements.txt')
+
+MAIN_TEMPLATE = '''# -*- coding: utf-8 -*-
+"""BSC靓号生成器 zipapp 入口（由 build_bundle.py 生成）"""
+import os
+import sys
+import shutil
+import zipfile
+
+BUNDLE_ID = {bundle_id!r}
+HAS_VENDOR = {has_vendor!r}
+
+
+def _extract_vendor(archive):
+    """首次运行时把依赖解压到缓存目录（依赖含C扩展和数据文件，无法直接从zip导入）"""
+    root = os.environ.get('BSC_BUNDLE_CACHE') or os.path.join(
+        os.path.expanduser('~'), '.cache', 'bsc_generator')
+    target = os.path.join(root, BUNDLE_ID)
+    if not os.path.exists(os.path.join(target, '.complete')):
+        tmp = f'{{target}}.tmp{{os.getpid()}}'
+        with zipfile.ZipFile(archive) as zf:
+            members = [n for n in zf.namelist() if n.startswith('_vendor/')]
+            zf.extractall(tmp, members)
+        open(os.path.join(tmp, '.complete'), 'w').close()
+        try:
+            os.rename(tmp, target)
+        except OSError:
+            # 其他进程已经解压完成
+            shutil.rmtree(tmp, ignore_errors=True)
+    return os.path.join(target, '_vendor')
+
+
+if HAS_VENDOR:
+    sys.path.insert(1, _extract_vendor(os.path.dirname(os.path.abspath(__file__))))
+
+import ultra_generator_v2
+
+if __name__ == '__main__':
+    ultra_generator_v2.main()
+'''
+
+
+def read_version():
+    """从生成脚本中读取版本号（不导入脚本）"""
+    with open(SCRIPT, 'r', encoding='utf-8') as f:
+        match = re.search(r"^__version__ = '([^']+)'", f.read(), re.M)
+    return match.group(1) if match else '0.0.0'
+
+
+def install_dependencies(target, args):
+    """用pip把依赖安装到打包目录"""
+    cmd = [sys.executable, '-m', 'pip', 'install', '--target', target,
+           '--no-compile', '--disable-pip-version-check', '--quiet',
+           '-r', REQUIREMENTS]
+    if args.wheels:
+        cmd += ['--no-index', '--find-links', args.wheels]
+    if args.platform or args.python_version:
+        cmd += ['--only-binary=:all:']
+        if args.platform:
+            cmd += ['--platform', args.platform]
+        if args.python_version:
+            cmd += ['--python-version', args.python_version]
+    if args.index_url:
+        cmd += ['-i', args.index_url]
+    subprocess.run(cmd, check=True)
+
+    # 去掉运行时不需要的文件
+    for root, dirs, files in os.walk(target):
+        for d in list(dirs):
+            if d in ('__pycache__', 'tests', 'bin'):
+                shutil.rmtree(os.path.join(root, d))
+                dirs.remove(d)
+
+
+def bundle_digest(staging):
+    """打包内容的摘要，用于区分同一版本的不同构建"""
+    h = hashlib.sha256()
+    for root, dirs, files in os.walk(staging):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            h.update(os.path.relpath(path, staging).encode())
+            with open(path, 'rb') as f:
+                h.update(f.read())
+    return h.hexdigest()[:12]
+
+
+def measure(bundle):
+    """测量冷启动（首次解压）和热启动的依赖导入时间"""
+    cache = tempfile.mkdtemp(prefix='bsc_bundle_cache_')
+    env = dict(os.environ, BSC_BUNDLE_CACHE=cache)
+    try:
+        for label in ('冷启动', '热启动'):
+            start = time.time()
+            result = subprocess.run([sys.executable, bundle, '--check-deps'],
+                                    env=env, capture_output=True, text=True)
+            elapsed = time.time() - start
+            output = (result.stdout or result.stderr).strip()
+            print(f"   {label}: {elapsed * 1000:.0f} ms  {output}")
+    finally:
+        shutil.rmtree(cache, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='打包生成器为单文件 zipapp')
+    parser.add_argument('--output', type=str, default=os.path.join(HERE, 'dist'),
+                        help='输出目录（默认 bsc_generator/dist）')
+    parser.add_argument('--wheels', type=str, default=None,
+                        help='预先下载的wheel目录（离线打包）')
+    parser.add_argument('--platform', type=str, default=None,
+                        help='目标平台，例如 manylinux2014_x86_64')
+    parser.add_argument('--python-version', type=str, default=None,
+                        help='目标Python版本，例如 3.10')
+    parser.add_argument('--index-url', type=str, default=None,
+                        help='pip镜像地址')
+    parser.add_argument('--no-deps', action='store_true',
+                        help='不打包依赖')
+    parser.add_argument('--no-measure', action='store_true',
+                        help='不测量启动时间')
+    args = parser.parse_args()
+
+    version = read_version()
+    staging = tempfile.mkdtemp(prefix='bsc_bundle_')
+    try:
+        print(f"📦 打包生成器 v{version}...")
+        shutil.copy(SCRIPT, os.path.join(staging, 'ultra_generator_v2.py'))
+
+        has_vendor = not args.no_deps
+        if has_vendor:
+            print("📥 安装依赖到打包目录...")
+            install_dependencies(os.path.join(staging, '_vendor'), args)
+
+        bundle_id = f"{version}-{bundle_digest(staging)}"
+        with open(os.path.join(staging, '__main__.py'), 'w', encoding='utf-8') as f:
+            f.write(MAIN_TEMPLATE.format(bundle_id=bundle_id, has_vendor=has_vendor))
+
+        os.makedirs(args.output, exist_ok=True)
+        # 文件名带内容摘要：脚本改动后即使版本号不变也是新文件，B端不会误用旧包
+        bundle = os.path.join(args.output, f'ultra_generator_v2-{bundle_id}.pyz')
+        zipapp.create_archive(staging, bundle, interpreter='/usr/bin/env python3',
+                              compressed=True)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    size_mb = os.path.getsize(bundle) / 1024 / 1024
+    print(f"✅ 已生成: {bundle} ({size_mb:.1f} MB, {bundle_id})")
+
+    if not args.no_measure and not (args.platform or args.python_version):
+        print("⏱️  启动时间:")
+        measure(bundle)
+
+
+if __name__ == '__main__':
+    main()
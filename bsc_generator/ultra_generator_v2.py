@@ -6,30 +6,814 @@ BSC靓号生成器 V2 - 运气加持高性能版
 """
 
 import os
+import re
 import sys
+import json
+import glob
 import time
 import multiprocessing
 import argparse
+import heapq
+import signal
 from datetime import datetime
-from eth_keys import keys
-from eth_utils import to_checksum_address
 import secrets
 
+__version__ = '2.1.0'
+
+# 密码学依赖按需导入：eth_utils 会连带导入 pydantic 等，约占启动时间的85%，
+# 而 --detect-cpus、--help、参数检查都不需要它们
+keys = None
+to_checksum_address = None
+
+
+def load_crypto():
+    """导入 eth_keys / eth_utils（只在第一次调用时真正导入）"""
+    global keys, to_checksum_address
+    if keys is None:
+        from eth_keys import keys as _keys
+        from eth_utils import to_checksum_address as _to_checksum_address
+        keys, to_checksum_address = _keys, _to_checksum_address
+    return keys
+
+
+# ========== 规则匹配引擎 ==========
+#
+# 规则语法: 多条规则用分号分隔，每条规则为 "类型:参数"，全部满足才算匹配。
+#   prefix:8888          前缀
+#   suffix:8888          后缀
+#   contains:888         包含
+#   zeros:6              至少N位前导0（等同于 prefix:000000）
+#   prefix-in:168,518    前缀属于集合（也可写 @文件名，每行一个）
+#   suffix-in:168,518    后缀属于集合
+#   repeat-head:5        开头N位相同
+#   repeat-tail:6        结尾N位相同
+#   repeat:7             任意位置N位连续相同
+#   mirror-tail:6        结尾N位回文（镜像）
+#
+# 所有规则在20字节的地址摘要上编译成最便宜的检查（字节比较、半字节掩码、
+# 查找表），需要十六进制字符串的规则排在后面，并按通过概率从低到高排序，
+# 使绝大多数地址在第一次字节比较时就被淘汰。
+
+HEX_CHARS = '0123456789abcdefABCDEF'
+
+# 高低半字节相同的字节: 0x00, 0x11, ..., 0xff
+_DOUBLE_NIBBLE = frozenset(range(0, 256, 17))
+
+# 规则阶段: 字节检查最便宜，十六进制字符串检查次之
+STAGE_BYTES = 0
+STAGE_HEX = 1
+
+
+class PatternRule:
+    """编译后的单条规则"""
+
+    def __init__(self, kind, arg, check, probability, stage=STAGE_BYTES):
+        self.kind = kind
+        self.arg = arg
+        self.check = check
+        self.probability = probability
+        self.stage = stage
+
+    def describe(self):
+        """规则的可读描述"""
+        if isinstance(self.arg, (list, tuple)):
+            values = ','.join(self.arg)
+            if len(values) > 40:
+                values = f"{len(self.arg)}个候选"
+            return f"{self.kind}:{values}"
+        return f"{self.kind}:{self.arg}"
+
+
+def _check_hex(kind, text):
+    """验证十六进制参数"""
+    if not text or any(c not in HEX_CHARS for c in text):
+        raise ValueError(f"规则 {kind} 的参数必须是十六进制字符: {text!r}")
+    if len(text) > 40:
+        raise ValueError(f"规则 {kind} 的参数过长: {text!r}")
+
+
+def _check_count(kind, arg, minimum=1):
+    """验证数量参数"""
+    try:
+        n = int(arg)
+    except (TypeError, ValueError):
+        raise ValueError(f"规则 {kind} 的参数必须是整数: {arg!r}")
+    if n < minimum or n > 40:
+        raise ValueError(f"规则 {kind} 的参数必须在 {minimum}-40 之间: {n}")
+    return n
+
+
+def _load_values(kind, arg):
+    """解析集合参数（逗号分隔或 @文件）"""
+    if arg.startswith('@'):
+        with open(arg[1:], 'r', encoding='utf-8') as f:
+            values = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    else:
+        values = [v.strip() for v in arg.split(',') if v.strip()]
+    if not values:
+        raise ValueError(f"规则 {kind} 至少需要一个候选值")
+    for v in values:
+        _check_hex(kind, v)
+    return values
+
+
+def parse_pattern(text):
+    """解析规则字符串，返回 [(类型, 参数), ...]"""
+    specs = []
+    if not text:
+        return specs
+    for item in text.split(';'):
+        item = item.strip()
+        if not item:
+            continue
+        if ':' not in item:
+            raise ValueError(f"规则格式错误（应为 类型:参数）: {item!r}")
+        kind, arg = item.split(':', 1)
+        kind = kind.strip().lower()
+        arg = arg.strip()
+        if kind not in RULE_BUILDERS:
+            raise ValueError(f"未知规则类型: {kind}")
+        if kind in ('prefix-in', 'suffix-in'):
+            arg = tuple(_load_values(kind, arg))
+        specs.append((kind, arg))
+    return specs
+
+
+def _rule_prefix(arg, case_sensitive):
+    _check_hex('prefix', arg)
+    text = arg.lower()
+    n = len(text)
+    head = bytes.fromhex(text[:n - n % 2])
+    if n % 2 == 0:
+        check = lambda addr: addr.startswith(head)
+    else:
+        k = len(head)
+        nibble = int(text[-1], 16)
+        check = lambda addr: addr.startswith(head) and addr[k] >> 4 == nibble
+    return PatternRule('prefix', arg, check, 16.0 ** -n)
+
+
+def _rule_suffix(arg, case_sensitive):
+    _check_hex('suffix', arg)
+    text = arg.lower()
+    n = len(text)
+    tail = bytes.fromhex(text[n % 2:])
+    if n % 2 == 0:
+        check = lambda addr: addr.endswith(tail)
+    else:
+        k = -len(tail) - 1
+        nibble = int(text[0], 16)
+        check = lambda addr: addr.endswith(tail) and addr[k] & 0xF == nibble
+    return PatternRule('suffix', arg, check, 16.0 ** -n)
+
+
+def _rule_contains(arg, case_sensitive):
+    _check_hex('contains', arg)
+    text = arg.lower()
+    n = len(text)
+    check = lambda h: text in h
+    return PatternRule('contains', arg, check, min(1.0, (41 - n) * 16.0 ** -n), STAGE_HEX)
+
+
+def _rule_zeros(arg, case_sensitive):
+    n = _check_count('zeros', arg)
+    rule = _rule_prefix('0' * n, case_sensitive)
+    return PatternRule('zeros', n, rule.check, rule.probability)
+
+
+def _rule_prefix_in(values, case_sensitive):
+    # 按长度分组，每组取前n个半字节的整数值在查找表中查询
+    groups = {}
+    for v in values:
+        groups.setdefault(len(v), set()).add(int(v, 16))
+    lookups = []
+    probability = 0.0
+    for n, table in sorted(groups.items()):
+        nb = (n + 1) // 2
+        shift = 4 * (nb * 2 - n)
+        lookups.append((nb, shift, frozenset(table)))
+        probability += len(table) * 16.0 ** -n
+    if len(lookups) == 1:
+        nb, shift, table = lookups[0]
+        check = lambda addr: int.from_bytes(addr[:nb], 'big') >> shift in table
+    else:
+        def check(addr):
+            for nb, shift, table in lookups:
+                if int.from_bytes(addr[:nb], 'big') >> shift in table:
+                    return True
+            return False
+    return PatternRule('prefix-in', values, check, min(1.0, probability))
+
+
+def _rule_suffix_in(values, case_sensitive):
+    groups = {}
+    for v in values:
+        groups.setdefault(len(v), set()).add(int(v, 16))
+    lookups = []
+    probability = 0.0
+    for n, table in sorted(groups.items()):
+        nb = (n + 1) // 2
+        mask = (1 << (4 * n)) - 1
+        lookups.append((-nb, mask, frozenset(table)))
+        probability += len(table) * 16.0 ** -n
+    if len(lookups) == 1:
+        start, mask, table = lookups[0]
+        check = lambda addr: int.from_bytes(addr[start:], 'big') & mask in table
+    else:
+        def check(addr):
+            for start, mask, table in lookups:
+                if int.from_bytes(addr[start:], 'big') & mask in table:
+                    return True
+            return False
+    return PatternRule('suffix-in', values, check, min(1.0, probability))
+
+
+def _rule_repeat_tail(arg, case_sensitive):
+    n = _check_count('repeat-tail', arg, 2)
+    nb = (n + 1) // 2
+    runs = [c * n for c in '0123456789abcdef']
+
+    def check(addr):
+        last = addr[-1]
+        # 最后一个字节的两个半字节不同时直接淘汰（15/16的地址）
+        if last not in _DOUBLE_NIBBLE:
+            return False
+        return addr[-nb:].hex().endswith(runs[last & 0xF])
+
+    return PatternRule('repeat-tail', n, check, 16.0 ** -(n - 1))
+
+
+def _rule_repeat_head(arg, case_sensitive):
+    n = _check_count('repeat-head', arg, 2)
+    nb = (n + 1) // 2
+    runs = [c * n for c in '0123456789abcdef']
+
+    def check(addr):
+        first = addr[0]
+        if first not in _DOUBLE_NIBBLE:
+            return False
+        return addr[:nb].hex().startswith(runs[first >> 4])
+
+    return PatternRule('repeat-head', n, check, 16.0 ** -(n - 1))
+
+
+def _rule_mirror_tail(arg, case_sensitive):
+    n = _check_count('mirror-tail', arg, 2)
+    nb = (n + 1) // 2
+
+    def check(addr):
+        tail = addr[-nb:].hex()[-n:]
+        return tail == tail[::-1]
+
+    return PatternRule('mirror-tail', n, check, 16.0 ** -(n // 2))
+
+
+def _rule_repeat(arg, case_sensitive):
+    n = _check_count('repeat', arg, 2)
+    search = re.compile(r'(.)\1{%d}' % (n - 1)).search
+    check = lambda h: search(h) is not None
+    return PatternRule('repeat', n, check, min(1.0, (41 - n) * 16.0 ** -(n - 1)), STAGE_HEX)
+
+
+RULE_BUILDERS = {
+    'prefix': _rule_prefix,
+    'suffix': _rule_suffix,
+    'contains': _rule_contains,
+    'zeros': _rule_zeros,
+    'leading-zeros': _rule_zeros,
+    'prefix-in': _rule_prefix_in,
+    'suffix-in': _rule_suffix_in,
+    'repeat-head': _rule_repeat_head,
+    'repeat-tail': _rule_repeat_tail,
+    'repeat': _rule_repeat,
+    'mirror-tail': _rule_mirror_tail,
+}
+
+
+class PatternMatcher:
+    """把规则列表编译成单个匹配函数 match(addr_bytes) -> bool"""
+
+    def __init__(self, specs, case_sensitive=False):
+        self.specs = list(specs)
+        self.case_sensitive = case_sensitive
+        self.rules = [RULE_BUILDERS[kind](arg, case_sensitive) for kind, arg in self.specs]
+        # 便宜的规则在前；同一阶段内通过概率低的在前
+        self.rules.sort(key=lambda r: (r.stage, r.probability))
+        self.match = self._compile()
+
+    def __reduce__(self):
+        # 编译后的闭包无法pickle，子进程中按规则重新编译（Windows spawn）
+        return (PatternMatcher, (self.specs, self.case_sensitive))
+
+    def probability(self):
+        """单次尝试的理论命中概率"""
+        p = 1.0
+        for rule in self.rules:
+            p *= rule.probability
+        return p
+
+    def _case_checks(self):
+        """区分大小写时，在校验和地址上做最终检查"""
+        checks = []
+        if not self.case_sensitive:
+            return checks
+        for kind, arg in self.specs:
+            if kind not in ('prefix', 'suffix', 'contains') or arg == arg.lower() and arg == arg.upper():
+                continue
+            if kind == 'prefix':
+                checks.append(lambda a, t=arg: a[2:2 + len(t)] == t)
+            elif kind == 'suffix':
+                checks.append(lambda a, t=arg: a.endswith(t))
+            else:
+                checks.append(lambda a, t=arg: t in a[2:])
+        return checks
+
+    def _compile(self):
+        byte_checks = tuple(r.check for r in self.rules if r.stage == STAGE_BYTES)
+        hex_checks = tuple(r.check for r in self.rules if r.stage == STAGE_HEX)
+        case_checks = tuple(self._case_checks())
+
+        # 单条字节规则是最常见的情况，直接返回规则本身，避免额外的函数调用
+        if len(byte_checks) == 1 and not hex_checks and not case_checks:
+            return byte_checks[0]
+
+        def match(addr):
+            for check in byte_checks:
+                if not check(addr):
+                    return False
+            if hex_checks:
+                h = addr.hex()
+                for check in hex_checks:
+                    if not check(h):
+                        return False
+            if case_checks:
+                checksum = to_checksum_address(addr)
+                for check in case_checks:
+                    if not check(checksum):
+                        return False
+            return True
+
+        return match
+
+
+# ========== 评分模式 ==========
+#
+# 不要求精确匹配，而是在限定时间内寻找得分最高的K个地址。
+# 评分函数作用于20字节地址，必须足够便宜（每次尝试都会调用）。
+
+_HEX_RUN = re.compile(r'(.)\1*')
+
+
+def _score_zero_bytes(addr):
+    """前导零字节数（调用数据更便宜）"""
+    return len(addr) - len(addr.lstrip(b'\x00'))
+
+
+def _score_zeros(addr):
+    """前导零半字节数"""
+    stripped = addr.lstrip(b'\x00')
+    n = (len(addr) - len(stripped)) * 2
+    if stripped and stripped[0] < 16:
+        n += 1
+    return n
+
+
+def _score_total_zero_bytes(addr):
+    """零字节总数"""
+    return addr.count(0)
+
+
+def _score_repeat(addr):
+    """最长连续相同字符"""
+    return max(len(m.group()) for m in _HEX_RUN.finditer(addr.hex()))
+
+
+def _score_repeat_tail(addr):
+    """结尾连续相同字符数"""
+    h = addr.hex()
+    return len(h) - len(h.rstrip(h[-1]))
+
+
+def _score_repeat_head(addr):
+    """开头连续相同字符数"""
+    h = addr.hex()
+    return len(h) - len(h.lstrip(h[0]))
+
+
+SCORERS = {
+    'zero-bytes': _score_zero_bytes,
+    'zeros': _score_zeros,
+    'total-zero-bytes': _score_total_zero_bytes,
+    'repeat': _score_repeat,
+    'repeat-tail': _score_repeat_tail,
+    'repeat-head': _score_repeat_head,
+}
+
+
+def parse_duration(text):
+    """解析时间（秒），支持 s/m/h 后缀，例如 90、10m、1.5h"""
+    text = str(text).strip().lower()
+    units = {'s': 1, 'm': 60, 'h': 3600}
+    factor = 1
+    if text and text[-1] in units:
+        factor = units[text[-1]]
+        text = text[:-1]
+    try:
+        seconds = float(text) * factor
+    except ValueError:
+        raise ValueError(f"无效的时间: {text!r}")
+    if seconds <= 0:
+        raise ValueError(f"时间必须大于0: {text!r}")
+    return seconds
+
+
+# ========== CPU拓扑 ==========
+#
+# 可用CPU = 亲和性掩码 ∩ cgroup配额。工作进程按"先物理核心、后超线程兄弟"
+# 的顺序固定到CPU上，并在NUMA节点之间轮流分配。进程数少于可用CPU时不绑定：
+# 每个任务都从同一位置开始绑定，同一台机器上的多个任务会挤在相同的核心上，
+# 交给内核调度更好。
+
+def _read_sys(path):
+    """读取sysfs/cgroupfs文件，不存在时返回None"""
+    try:
+        with open(path, 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _parse_cpu_list(text):
+    """解析 "0-3,8-11" 格式的CPU列表"""
+    cpus = set()
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = part.split('-', 1)
+            cpus.update(range(int(start), int(end) + 1))
+        else:
+            cpus.add(int(part))
+    return cpus
+
+
+def _cgroup_ancestors(root, path):
+    """进程所在cgroup目录及其各级父目录，直到挂载根目录"""
+    path = path.rstrip('/')
+    dirs = [root + path]
+    while path:
+        path = path.rsplit('/', 1)[0]
+        dirs.append(root + path)
+    return dirs
+
+
+def cgroup_cpu_limit(cgroup_root='/sys/fs/cgroup'):
+    """cgroup CPU配额（以CPU个数计），无限制时返回None
+    
+    配额可能设在父cgroup上（例如systemd slice），需要逐级向上取最小值
+    """
+    limits = []
+    text = _read_sys('/proc/self/cgroup') or ''
+    for line in text.splitlines():
+        hierarchy, controllers, path = line.split(':', 2)
+        if hierarchy == '0' and not controllers:
+            # cgroup v2: cpu.max 内容为 "<配额> <周期>"，无限制时配额为max
+            for directory in _cgroup_ancestors(cgroup_root, path):
+                value = _read_sys(directory + '/cpu.max')
+                if value and not value.startswith('max'):
+                    quota, _, period = value.partition(' ')
+                    limits.append(int(quota) / int(period or 100000))
+        elif 'cpu' in controllers.split(','):
+            # cgroup v1: 无限制时 cfs_quota_us 为 -1
+            for directory in _cgroup_ancestors(cgroup_root + '/cpu', path):
+                quota = _read_sys(directory + '/cpu.cfs_quota_us')
+                period = _read_sys(directory + '/cpu.cfs_period_us')
+                if quota and period and int(quota) > 0:
+                    limits.append(int(quota) / int(period))
+    return min(limits) if limits else None
+
+
+def detect_cpu_topology():
+    """检测可用CPU、物理核心、NUMA节点和cgroup配额"""
+    logical = os.cpu_count() or 1
+    if hasattr(os, 'sched_getaffinity'):
+        usable = sorted(os.sched_getaffinity(0))
+    else:
+        usable = list(range(logical))
+    
+    # 按超线程兄弟分组得到物理核心
+    cores = {}
+    for cpu in usable:
+        text = _read_sys(f'/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list')
+        key = tuple(sorted(_parse_cpu_list(text))) if text else (cpu,)
+        cores.setdefault(key, []).append(cpu)
+    
+    # CPU所属的NUMA节点
+    node_of = {}
+    for path in glob.glob('/sys/devices/system/node/node*/cpulist'):
+        node = int(os.path.basename(os.path.dirname(path))[4:])
+        for cpu in _parse_cpu_list(_read_sys(path) or ''):
+            node_of[cpu] = node
+    
+    # 放置顺序: 每个物理核心的第1个线程（NUMA节点间轮流），然后第2个线程...
+    order = []
+    depth = max(len(threads) for threads in cores.values()) if cores else 0
+    for level in range(depth):
+        by_node = {}
+        for threads in cores.values():
+            if level < len(threads):
+                cpu = threads[level]
+                by_node.setdefault(node_of.get(cpu, 0), []).append(cpu)
+        queues = [by_node[n] for n in sorted(by_node)]
+        while any(queues):
+            for q in queues:
+                if q:
+                    order.append(q.pop(0))
+    
+    quota = cgroup_cpu_limit()
+    recommended = len(usable) or 1
+    if quota:
+        recommended = max(1, min(recommended, round(quota)))
+    
+    return {
+        'logical': logical,
+        'usable': len(usable),
+        'physical': len(cores),
+        'numa_nodes': len(set(node_of.get(cpu, 0) for cpu in usable)) or 1,
+        'cgroup_quota': quota,
+        'recommended': recommended,
+        'order': order,
+    }
+
+
+def _exit_with_parent():
+    """主进程意外退出（例如被SIGKILL）时让工作进程随之退出，仅Linux有效"""
+    try:
+        import ctypes
+        PR_SET_PDEATHSIG = 1
+        ctypes.CDLL(None).prctl(PR_SET_PDEATHSIG, signal.SIGKILL)
+    except (OSError, AttributeError, TypeError):
+        pass
+
+
+def _pinned_worker(cpu, target, *args):
+    """把当前进程固定到指定CPU后运行工作函数"""
+    # 停止信号发给整个进程组时由主进程统一处理：主进程设置stop_event，
+    # 工作进程提交计数后自行退出，命中的地址留在队列中由主进程保存
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _exit_with_parent()
+    if cpu is not None:
+        try:
+            os.sched_setaffinity(0, {cpu})
+        except (AttributeError, OSError):
+            pass
+    # fork时已从父进程继承；spawn（Windows）时在子进程中导入
+    load_crypto()
+    target(*args)
+
+
+# ========== 性能分析 ==========
+#
+# 每 sample 次尝试对一次尝试做分阶段计时（随机数、EC运算、哈希、匹配），
+# 计数器加锁和 queue.put 每次都计时（它们本来就很少发生）。
+# 各进程定期把累计快照发到 profile_queue，由 run() 合并。
+
+PROFILE_STAGES = ('rand', 'ec', 'hash', 'match', 'counter', 'queue')
+PROFILE_STAGE_NAMES = {
+    'rand': '随机数',
+    'ec': 'EC运算',
+    'hash': '哈希',
+    'match': '匹配',
+    'counter': '计数器锁',
+    'queue': '结果队列',
+}
+
+
+class StageProfiler:
+    """采样式分阶段计时器"""
+
+    def __init__(self, sample):
+        self.sample = sample
+        self.totals = dict.fromkeys(PROFILE_STAGES, 0.0)
+        self.counts = dict.fromkeys(PROFILE_STAGES, 0)
+        self.attempts = 0
+        self.last_publish = time.time()
+
+    def add(self, stage, seconds):
+        self.totals[stage] += seconds
+        self.counts[stage] += 1
+
+    def attempt(self, token_bytes, PrivateKey, match):
+        """计时执行一次完整尝试"""
+        perf = time.perf_counter
+        t0 = perf()
+        private_key = token_bytes(32)
+        t1 = perf()
+        public_key = PrivateKey(private_key).public_key
+        t2 = perf()
+        address = public_key.to_canonical_address()
+        t3 = perf()
+        hit = match is None or match(address)
+        t4 = perf()
+        self.add('rand', t1 - t0)
+        self.add('ec', t2 - t1)
+        self.add('hash', t3 - t2)
+        self.add('match', t4 - t3)
+        return private_key, address, hit
+
+    def snapshot(self):
+        return {
+            'pid': os.getpid(),
+            'attempts': self.attempts,
+            'totals': dict(self.totals),
+            'counts': dict(self.counts),
+        }
+
+    def publish(self, profile_queue, force=False):
+        """每秒最多发布一次累计快照"""
+        now = time.time()
+        if force or now - self.last_publish >= 1.0:
+            profile_queue.put(self.snapshot())
+            self.last_publish = now
+
+
+def merge_profiles(snapshots, elapsed):
+    """合并各进程的快照，返回报告字典"""
+    attempts = sum(snap['attempts'] for snap in snapshots)
+    stages = {}
+    for stage in PROFILE_STAGES:
+        total = sum(snap['totals'][stage] for snap in snapshots)
+        count = sum(snap['counts'][stage] for snap in snapshots)
+        avg = total / count if count else 0.0
+        if stage in ('counter', 'queue'):
+            # 非采样阶段：按总尝试次数摊销
+            per_attempt = total / attempts if attempts else 0.0
+        else:
+            per_attempt = avg
+        stages[stage] = {
+            'samples': count,
+            'avg_us': avg * 1e6,
+            'per_attempt_us': per_attempt * 1e6,
+        }
+    total_per_attempt = sum(st['per_attempt_us'] for st in stages.values())
+    for st in stages.values():
+        st['share'] = st['per_attempt_us'] / total_per_attempt if total_per_attempt else 0.0
+    return {
+        'version': __version__,
+        'generated_at': datetime.now().isoformat(),
+        'elapsed': elapsed,
+        'workers': len(snapshots),
+        'attempts': attempts,
+        'stages': stages,
+    }
+
+
+def _cprofile_worker(profile_dir, target, *args):
+    """在cProfile下运行工作函数，退出时写出 worker_<pid>.pstats"""
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        target(*args)
+    finally:
+        profiler.disable()
+        profiler.dump_stats(os.path.join(profile_dir, f'worker_{os.getpid()}.pstats'))
+
+
+# ==================== 结果写入 ====================
+# 高数量运行时每个命中都开关文件、立即落盘代价很高。ResultWriter 在运行
+# 开始时截断重建结果文件并保持这一个写句柄，之后只在末尾写入：记录先在内存
+# 中缓冲，按批量大小或时间间隔写出，fsync 另有更长的间隔。运行期间文件只增
+# 不改，后端可以按偏移量增量同步。
+
+RESULT_FORMATS = ('text', 'jsonl', 'csv')
+RESULT_FILES = {
+    'text': 'ultra_vanity_wallets.txt',
+    'jsonl': 'ultra_vanity_wallets.jsonl',
+    'csv': 'ultra_vanity_wallets.csv',
+}
+CSV_COLUMNS = ('index', 'address', 'private_key', 'score', 'found_at')
+
+
+class ResultWriter:
+    """带缓冲的只追加结果文件"""
+
+    def __init__(self, path, fmt='text', header='', batch_size=100,
+                 flush_interval=1.0, fsync_interval=5.0):
+        if fmt not in RESULT_FORMATS:
+            raise ValueError(f"未知结果格式: {fmt}（可选: {', '.join(RESULT_FORMATS)}）")
+        self.path = path
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.buffer = []
+        self.count = 0
+        self.last_flush = self.last_sync = time.time()
+        # 每次运行截断重建（不混入上次运行的结果），表头在打开时写入
+        self.file = open(path, 'w', encoding='utf-8', newline='')
+        if fmt == 'text':
+            self.buffer.append(header)
+        elif fmt == 'csv':
+            self.buffer.append(','.join(CSV_COLUMNS) + '\n')
+        self.flush(sync=True)
+
+    def format(self, index, address, private_key, score, found_at):
+        if self.fmt == 'jsonl':
+            return json.dumps({
+                'index': index, 'address': address, 'private_key': '0x' + private_key,
+                'score': score, 'found_at': found_at,
+            }) + '\n'
+        if self.fmt == 'csv':
+            # 各字段都不含逗号和引号，无需转义
+            return f"{index},{address},0x{private_key},{'' if score is None else score},{found_at}\n"
+        record = f"钱包 #{index}\n地址: {address}\n私钥: 0x{private_key}\n"
+        if score is not None:
+            record += f"得分: {score}\n"
+        return record + f"生成时间: {found_at}\n" + "\n" + "-" * 70 + "\n\n"
+
+    def add(self, index, address, private_key, score=None):
+        """缓冲一条记录，达到批量大小或间隔时写出"""
+        found_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.buffer.append(self.format(index, address, private_key, score, found_at))
+        self.count += 1
+        if len(self.buffer) >= self.batch_size or time.time() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self, sync=False):
+        """写出缓冲区；fsync 每 fsync_interval 秒最多一次（sync=True 时强制）"""
+        now = time.time()
+        if self.buffer:
+            self.file.write(''.join(self.buffer))
+            self.buffer = []
+            self.file.flush()
+        self.last_flush = now
+        if sync or now - self.last_sync >= self.fsync_interval:
+            os.fsync(self.file.fileno())
+            self.last_sync = now
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush(sync=True)
+        self.file.close()
+
 
 class VanityGenerator:
     """靓号生成器"""
     
     def __init__(self, prefix='', suffix='', contains='', 
-                 case_sensitive=False, wallet_count=1, processes=None):
+                 case_sensitive=False, wallet_count=1, processes=None,
+                 pattern='', score=None, time_budget=None, top_k=10, pin=True,
+                 profile_sample=0, profile_dir=None, result_format='text'):
         self.prefix = prefix.lower() if not case_sensitive else prefix
         self.suffix = suffix.lower() if not case_sensitive else suffix
         self.contains = contains.lower() if not case_sensitive else contains
         self.case_sensitive = case_sensitive
+        self.pattern = pattern
+        
+        # 编译规则（前缀/后缀/包含也作为规则参与排序）
+        specs = []
+        if self.prefix:
+            specs.append(('prefix', self.prefix))
+        if self.suffix:
+            specs.append(('suffix', self.suffix))
+        if self.contains:
+            specs.append(('contains', self.contains))
+        specs.extend(parse_pattern(pattern))
+        self.matcher = PatternMatcher(specs, case_sensitive)
+        load_crypto()
+        
+        # 评分模式
+        if score is not None and score not in SCORERS:
+            raise ValueError(f"未知评分函数: {score}（可选: {', '.join(SCORERS)}）")
+        self.score = score
+        self.time_budget = time_budget
+        self.top_k = top_k
         self.wallet_count = wallet_count
-        # 使用所有核心以获得最大性能
-        self.processes = processes or multiprocessing.cpu_count()
+        # 默认使用全部可用CPU（亲和性掩码与cgroup配额取交集）
+        self.topology = detect_cpu_topology()
+        self.processes = processes or self.topology['recommended']
+        self.pin = pin
+        
+        # 性能分析（profile_sample=0 时关闭）
+        self.profile_sample = profile_sample
+        self.profile_dir = profile_dir
+        self.profile_queue = multiprocessing.Queue() if profile_sample else None
+        self.profile_snapshots = {}
+        
+        # 结果文件
+        if result_format not in RESULT_FORMATS:
+            raise ValueError(f"未知结果格式: {result_format}（可选: {', '.join(RESULT_FORMATS)}）")
+        self.result_format = result_format
+        self.output_file = RESULT_FILES[result_format]
+        self.writer = None
         
         self.found_wallets = []
+        # 收到SIGTERM/SIGINT后置位，主循环据此停止（信号处理函数中只设置标志）
+        self.terminating = False
         self.attempts = multiprocessing.Value('i', 0)
         self.start_time = time.time()
         
@@ -45,31 +829,7 @@ class VanityGenerator:
     
     def check_match(self, address):
         """检查地址是否匹配（超级优化版）"""
-        # 直接操作字符串，避免创建新对象
-        addr = address[2:] if not self.case_sensitive else address[2:]
-        
-        # 不区分大小写时转换
-        if not self.case_sensitive:
-            addr = addr.lower()
-        
-        # 内联检查，减少函数调用
-        # 前缀检查（最快失败）
-        if self.prefix:
-            if not addr[:len(self.prefix)] == self.prefix:
-                return False
-        
-        # 后缀检查
-        if self.suffix:
-            suffix_len = len(self.suffix)
-            if not addr[-suffix_len:] == self.suffix:
-                return False
-        
-        # 包含检查（使用in操作符，C语言实现，很快）
-        if self.contains:
-            if self.contains not in addr:
-                return False
-        
-        return True
+        return self.matcher.match(bytes.fromhex(address[2:]))
     
     def worker(self, queue, stop_event):
         """工作进程（超级优化版）"""
@@ -77,39 +837,287 @@ class VanityGenerator:
         batch_size = 2000  # 增大批次，进一步减少锁竞争
         
         # 预先缓存函数，减少属性查找
-        generate = self.generate_wallet
-        check = self.check_match
+        # 热路径只计算20字节地址，校验和地址仅在命中时计算
+        token_bytes = secrets.token_bytes
+        PrivateKey = keys.PrivateKey
+        match = self.matcher.match
         is_stopped = stop_event.is_set
         
+        # 性能分析: 每 sample 次尝试计时一次，关闭时 sample=0
+        # 单独倒数，不能用 local_attempts 取模（它每批清零，sample 不整除批次时比例不对）
+        profiler = StageProfiler(self.profile_sample) if self.profile_sample else None
+        sample = self.profile_sample
+        until_sample = sample
+        perf = time.perf_counter
+        
         while not is_stopped():
-            private_key, address = generate()
+            until_sample -= 1
+            if until_sample == 0:
+                until_sample = sample
+                private_key, address, hit = profiler.attempt(token_bytes, PrivateKey, match)
+            else:
+                private_key = token_bytes(32)
+                address = PrivateKey(private_key).public_key.to_canonical_address()
+                hit = match(address)
             local_attempts += 1
             
-            if check(address):
-                queue.put((private_key, address))
-                # 更新最后一批
-                with self.attempts.get_lock():
-                    self.attempts.value += local_attempts
-                return
+            if hit:
+                t = perf()
+                queue.put((private_key.hex(), to_checksum_address(address)))
+                if profiler:
+                    profiler.add('queue', perf() - t)
             
             # 批量更新计数器
             if local_attempts >= batch_size:
+                t = perf()
                 with self.attempts.get_lock():
                     self.attempts.value += batch_size
+                if profiler:
+                    profiler.add('counter', perf() - t)
+                    profiler.attempts += batch_size
+                    profiler.publish(self.profile_queue)
                 local_attempts = 0
+        
+        # 更新最后一批（收到停止信号）
+        with self.attempts.get_lock():
+            self.attempts.value += local_attempts
+        if profiler:
+            profiler.attempts += local_attempts
+            profiler.publish(self.profile_queue, force=True)
+    
+    def score_worker(self, queue, stop_event):
+        """评分模式工作进程：维护本地Top-K堆，只发布进入堆的地址"""
+        local_attempts = 0
+        batch_size = 2000
+        
+        token_bytes = secrets.token_bytes
+        PrivateKey = keys.PrivateKey
+        match = self.matcher.match if self.matcher.rules else None
+        score = SCORERS[self.score]
+        is_stopped = stop_event.is_set
+        heappush = heapq.heappush
+        heapreplace = heapq.heapreplace
+        
+        heap = []
+        top_k = self.top_k
+        threshold = -1  # 进入本地堆所需的最低分（不含）
+        
+        profiler = StageProfiler(self.profile_sample) if self.profile_sample else None
+        sample = self.profile_sample
+        until_sample = sample  # 同 worker：独立于批次计数的采样倒数
+        perf = time.perf_counter
+        
+        while not is_stopped():
+            until_sample -= 1
+            if until_sample == 0:
+                until_sample = sample
+                private_key, address, hit = profiler.attempt(token_bytes, PrivateKey, match)
+            else:
+                private_key = token_bytes(32)
+                address = PrivateKey(private_key).public_key.to_canonical_address()
+                hit = match is None or match(address)
+            local_attempts += 1
+            
+            if hit:
+                value = score(address)
+                if value > threshold:
+                    entry = (value, address)
+                    if len(heap) < top_k:
+                        heappush(heap, entry)
+                    else:
+                        heapreplace(heap, entry)
+                    if len(heap) >= top_k:
+                        threshold = heap[0][0]
+                    t = perf()
+                    queue.put((value, private_key.hex(), to_checksum_address(address)))
+                    if profiler:
+                        profiler.add('queue', perf() - t)
+            
+            if local_attempts >= batch_size:
+                t = perf()
+                with self.attempts.get_lock():
+                    self.attempts.value += batch_size
+                if profiler:
+                    profiler.add('counter', perf() - t)
+                    profiler.attempts += batch_size
+                    profiler.publish(self.profile_queue)
+                local_attempts = 0
+        
+        with self.attempts.get_lock():
+            self.attempts.value += local_attempts
+        if profiler:
+            profiler.attempts += local_attempts
+            profiler.publish(self.profile_queue, force=True)
+    
+    def tune_worker(self, stop_event):
+        """调优用工作进程：只生成地址并计数"""
+        local_attempts = 0
+        batch_size = 100  # 测量窗口较短，使用小批次
+        token_bytes = secrets.token_bytes
+        PrivateKey = keys.PrivateKey
+        is_stopped = stop_event.is_set
+        
+        while not is_stopped():
+            PrivateKey(token_bytes(32)).public_key.to_canonical_address()
+            local_attempts += 1
+            if local_attempts >= batch_size:
+                with self.attempts.get_lock():
+                    self.attempts.value += batch_size
+                local_attempts = 0
+    
+    def request_stop(self, signum=None, frame=None):
+        """信号处理：请求停止，主循环会保存已找到的地址后退出"""
+        self.terminating = True
+    
+    def pin_order(self, count):
+        """工作进程绑定CPU的顺序；不绑定时返回空列表"""
+        order = self.topology['order']
+        if not self.pin or count < len(order):
+            return []
+        return order
+    
+    def start_workers(self, target, args, count=None):
+        """启动工作进程，占满全部可用CPU时按拓扑顺序固定到CPU"""
+        order = self.pin_order(count or self.processes)
+        if self.profile_dir:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            args = (self.profile_dir, target) + tuple(args)
+            target = _cprofile_worker
+        processes = []
+        for i in range(count or self.processes):
+            cpu = order[i % len(order)] if order else None
+            p = multiprocessing.Process(
+                target=_pinned_worker,
+                args=(cpu, target) + tuple(args)
+            )
+            p.start()
+            processes.append(p)
+        return processes
+    
+    def stop_workers(self, processes, stop_event, queue=None, on_item=None):
+        """通知工作进程退出并回收，期间取出它们还在提交的结果
+        
+        退出中的进程仍可能往结果队列和性能队列写数据，不边等边读的话写满管道的进程会卡住。
+        工作进程忽略SIGTERM，等待超时后只能SIGKILL。
+        """
+        stop_event.set()
+        deadline = time.time() + 1
+        while any(p.is_alive() for p in processes) and time.time() < deadline:
+            self.collect_profiles()
+            if queue is None:
+                time.sleep(0.05)
+                continue
+            try:
+                on_item(queue.get(timeout=0.05))
+            except Exception:
+                pass
+        for p in processes:
+            p.join(timeout=0.1)
+            if p.is_alive():
+                p.kill()
+        while queue is not None:
+            try:
+                on_item(queue.get_nowait())
+            except Exception:
+                break
+        self.collect_profiles()
+    
+    def tune_processes(self, seconds=3.0):
+        """试运行几种进程数，返回实测吞吐量最高的一个"""
+        topo = self.topology
+        candidates = {topo['physical'], topo['recommended']}
+        if topo['recommended'] > topo['physical']:
+            candidates.add((topo['physical'] + topo['recommended']) // 2)
+        candidates = sorted(n for n in candidates if 1 <= n <= topo['recommended'])
+        
+        if len(candidates) <= 1:
+            return candidates[0] if candidates else 1
+        
+        print(f"🧮 自动调优进程数: 候选 {candidates}，每个测量 {seconds:.0f} 秒")
+        best, best_speed = candidates[0], 0
+        for n in candidates:
+            stop_event = multiprocessing.Event()
+            processes = self.start_workers(self.tune_worker, (stop_event,), count=n)
+            # 跳过进程启动阶段再开始计时
+            time.sleep(min(1.0, seconds / 3))
+            start_attempts = self.attempts.value
+            start = time.time()
+            time.sleep(seconds)
+            speed = (self.attempts.value - start_attempts) / (time.time() - start)
+            self.stop_workers(processes, stop_event)
+            
+            print(f"   {n:>3d} 进程: {self.format_number(speed)}/秒")
+            if speed > best_speed:
+                best, best_speed = n, speed
+            if self.terminating:
+                break
+        
+        # 调优阶段不计入正式统计
+        with self.attempts.get_lock():
+            self.attempts.value = 0
+        self.start_time = time.time()
+        return best
+    
+    def collect_profiles(self):
+        """取出各进程发布的性能快照（每个进程只保留最新一份）"""
+        if not self.profile_queue:
+            return
+        while True:
+            try:
+                snap = self.profile_queue.get_nowait()
+            except Exception:
+                break
+            self.profile_snapshots[snap['pid']] = snap
+    
+    def report_profile(self, output_file='ultra_profile.json'):
+        """打印并保存合并后的性能报告"""
+        self.collect_profiles()
+        report = merge_profiles(list(self.profile_snapshots.values()),
+                                time.time() - self.start_time)
+        report['processes'] = self.processes
+        if self.profile_dir:
+            report['pstats_dir'] = os.path.abspath(self.profile_dir)
+        
+        print()
+        print("=" * 70)
+        print(f"🔬 性能分析 (采样 1/{self.profile_sample}, {report['workers']} 个进程)")
+        print("=" * 70)
+        print(f"{'阶段':<10s}{'采样数':>10s}{'平均(微秒)':>14s}{'每次尝试(微秒)':>16s}{'占比':>8s}")
+        for stage in PROFILE_STAGES:
+            st = report['stages'][stage]
+            print(f"{PROFILE_STAGE_NAMES[stage]:<10s}{st['samples']:>10d}"
+                  f"{st['avg_us']:>14.2f}{st['per_attempt_us']:>16.3f}{st['share'] * 100:>7.1f}%")
+        if self.profile_dir:
+            print(f"cProfile:   {report['pstats_dir']}/worker_<pid>.pstats")
+        print(f"报告文件:   {output_file}")
+        
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        return report
     
     def calculate_probability(self):
         """计算理论概率"""
-        total_combinations = 1
+        p = self.matcher.probability()
+        return max(1, round(1 / p)) if p > 0 else 1
+    
+    def benchmark(self, samples=20000):
+        """测量规则匹配相对于地址生成的单次开销"""
+        match = self.matcher.match
+        addresses = [secrets.token_bytes(20) for _ in range(samples)]
         
-        if self.prefix:
-            total_combinations *= 16 ** len(self.prefix)
-        if self.suffix:
-            total_combinations *= 16 ** len(self.suffix)
-        if self.contains:
-            total_combinations *= 16 ** len(self.contains)
+        start = time.perf_counter()
+        for address in addresses:
+            match(address)
+        match_cost = (time.perf_counter() - start) / samples
+        
+        n = max(1, samples // 10)
+        PrivateKey = keys.PrivateKey
+        start = time.perf_counter()
+        for _ in range(n):
+            PrivateKey(secrets.token_bytes(32)).public_key.to_canonical_address()
+        generate_cost = (time.perf_counter() - start) / n
         
-        return total_combinations
+        return generate_cost, match_cost
     
     def format_number(self, num):
         """格式化数字"""
@@ -155,9 +1163,25 @@ class VanityGenerator:
         print(f"前缀 (Prefix):     {prefix_val}")
         print(f"后缀 (Suffix):     {suffix_val}")
         print(f"包含 (Contains):   {contains_val}")
+        if self.pattern:
+            rules = ' ; '.join(r.describe() for r in self.matcher.rules)
+            print(f"规则 (Pattern):    {rules}")
         print(f"区分大小写:         {'是' if self.case_sensitive else '否'}")
+        topo = self.topology
+        topo_note = f" (可用 {topo['usable']} / 物理 {topo['physical']} / NUMA {topo['numa_nodes']}"
+        if topo['cgroup_quota']:
+            topo_note += f" / 配额 {topo['cgroup_quota']:.1f}"
+        topo_note += ", 已绑定)" if self.pin_order(self.processes) else ")"
+        if self.score:
+            print(f"评分函数:          {self.score}")
+            print(f"时间预算:          {self.time_budget:.0f} 秒")
+            print(f"保留数量:          Top {self.top_k}")
+            print(f"使用核心:          {self.processes} 核{topo_note}")
+            print("=" * 70)
+            print()
+            return
         print(f"生成数量:          {self.wallet_count} 个")
-        print(f"使用核心:          {self.processes} 核")
+        print(f"使用核心:          {self.processes} 核{topo_note}")
         
         probability = self.calculate_probability()
         print(f"理论尝试:          {self.format_number(probability)} 次")
@@ -165,29 +1189,121 @@ class VanityGenerator:
         print("=" * 70)
         print()
     
-    def save_wallet(self, private_key, address, index):
-        """保存钱包到文件"""
-        output_file = "ultra_vanity_wallets.txt"
-        
-        if index == 1:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write("=" * 70 + "\n")
-                f.write(f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"前缀: {self.prefix if self.prefix else '(无)'}\n")
-                f.write(f"后缀: {self.suffix if self.suffix else '(无)'}\n")
-                f.write(f"包含: {self.contains if self.contains else '(无)'}\n")
-                f.write(f"区分大小写: {'是' if self.case_sensitive else '否'}\n")
-                f.write("=" * 70 + "\n\n")
-        
-        with open(output_file, 'a', encoding='utf-8') as f:
-            f.write(f"钱包 #{index}\n")
-            f.write(f"地址: {address}\n")
-            f.write(f"私钥: 0x{private_key}\n")
-            f.write(f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write("\n" + "-" * 70 + "\n\n")
+    def open_writer(self):
+        """打开结果文件（文本格式写入运行参数表头）"""
+        header = "=" * 70 + "\n"
+        header += f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+        header += f"前缀: {self.prefix if self.prefix else '(无)'}\n"
+        header += f"后缀: {self.suffix if self.suffix else '(无)'}\n"
+        header += f"包含: {self.contains if self.contains else '(无)'}\n"
+        if self.pattern:
+            header += f"规则: {self.pattern}\n"
+        if self.score:
+            header += f"评分: {self.score} (Top {self.top_k})\n"
+        header += f"区分大小写: {'是' if self.case_sensitive else '否'}\n"
+        header += "=" * 70 + "\n\n"
+        return ResultWriter(self.output_file, self.result_format, header)
+    
+    def save_wallet(self, private_key, address, index, score=None):
+        """保存钱包到结果文件（缓冲写入）"""
+        if self.writer is None:
+            self.writer = self.open_writer()
+        self.writer.add(index, address, private_key, score)
+    
+    def run_score(self):
+        """运行评分模式：在时间预算内寻找得分最高的K个地址"""
+        self.print_config()
+        
+        queue = multiprocessing.Queue()
+        stop_event = multiprocessing.Event()
+        
+        print(f"⏰ 开始时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"🔄 启动 {self.processes} 个进程...")
+        print()
+        
+        processes = self.start_workers(self.score_worker, (queue, stop_event))
+        
+        # 全局Top-K（最小堆），合并各进程发布的改进
+        top = []
+        seen = set()
+        
+        def merge(item):
+            value, private_key, address = item
+            if address in seen:
+                return
+            entry = (value, address, private_key)
+            if len(top) < self.top_k:
+                heapq.heappush(top, entry)
+            elif entry > top[0]:
+                seen.discard(heapq.heapreplace(top, entry)[1])
+            else:
+                return
+            seen.add(address)
+        
+        deadline = self.start_time + self.time_budget
+        last_attempts = 0
+        last_time = time.time()
+        
+        try:
+            while time.time() < deadline and not self.terminating:
+                # 命中频繁时也要按时刷新状态、取走性能快照
+                try:
+                    merge(queue.get(timeout=0.2))
+                except Exception:
+                    pass
+                
+                current_time = time.time()
+                if current_time - last_time >= 1.0:
+                    self.collect_profiles()
+                    current_attempts = self.attempts.value
+                    instant_speed = (current_attempts - last_attempts) / (current_time - last_time)
+                    best = max(top) if top else None
+                    best_str = f"{best[0]} ({best[1]})" if best else "-"
+                    output = (
+                        f"\r剩余: {self.format_time(max(0, deadline - current_time)):>8s} | "
+                        f"已尝试: {self.format_number(current_attempts):>7s} | "
+                        f"速度: {self.format_number(instant_speed):>6s}/s | "
+                        f"最佳: {best_str}"
+                    )
+                    print(output, end='', flush=True)
+                    last_attempts = current_attempts
+                    last_time = current_time
+        finally:
+            # 停止并合并队列中剩余的结果
+            self.stop_workers(processes, stop_event, queue, merge)
+        
+        results = sorted(top, reverse=True)
+        self.writer = self.open_writer()
+        for index, (value, address, private_key) in enumerate(results, 1):
+            self.found_wallets.append((private_key, address))
+            self.save_wallet(private_key, address, index, score=value)
+        self.writer.close()
+        
+        total_time = time.time() - self.start_time
+        total_attempts = self.attempts.value
+        avg_speed = total_attempts / total_time if total_time > 0 else 0
+        
+        print()
+        print()
+        print("=" * 70)
+        print(f"✨ 完成！Top {len(results)} 地址 (评分: {self.score})")
+        print("=" * 70)
+        for index, (value, address, private_key) in enumerate(results, 1):
+            print(f"#{index:<3d} 得分: {value:<4d} {address}")
+        print("=" * 70)
+        print(f"总用时:     {total_time:.1f} 秒 ({total_time/60:.1f} 分钟)")
+        print(f"总尝试:     {self.format_number(total_attempts)} 次")
+        print(f"平均速度:   {self.format_number(avg_speed)}/秒")
+        print(f"保存位置:   {self.output_file}")
+        if self.profile_sample:
+            self.report_profile()
+        print()
     
     def run(self):
         """运行生成任务"""
+        if self.score:
+            return self.run_score()
+        
         self.print_config()
         
         queue = multiprocessing.Queue()
@@ -200,36 +1316,31 @@ class VanityGenerator:
         print(f"🔄 启动 {self.processes} 个进程...")
         print()
         
-        while found_count < self.wallet_count:
-            # 启动工作进程
-            processes = []
-            for i in range(self.processes):
-                p = multiprocessing.Process(
-                    target=self.worker,
-                    args=(queue, stop_event)
-                )
-                p.start()
-                processes.append(p)
-            
-            # 等待结果
-            last_attempts = 0
-            last_time = time.time()
-            
-            while True:
+        # 工作进程只启动一次，命中后继续搜索，直到找够数量
+        processes = self.start_workers(self.worker, (queue, stop_event))
+        self.writer = self.open_writer()
+        
+        # 等待结果
+        last_attempts = 0
+        last_time = time.time()
+        last_collect = last_time
+        
+        try:
+            while found_count < self.wallet_count and not self.terminating:
                 try:
                     # 尝试获取结果（非阻塞）
-                    private_key, address = queue.get(timeout=0.5)
-                    
+                    private_key, address = queue.get(timeout=0.2)
+                
                     # 找到一个！
                     found_count += 1
                     self.found_wallets.append((private_key, address))
-                    
+                
                     # 保存到文件
                     self.save_wallet(private_key, address, found_count)
-                    
+                
                     current_attempts = self.attempts.value
                     elapsed = time.time() - self.start_time
-                    
+                
                     print(f"\n")
                     print(f"✅ 找到匹配地址: {address}")
                     print(f"   私钥: 0x{private_key}")
@@ -237,51 +1348,51 @@ class VanityGenerator:
                     print(f"🎉 已找到 {found_count}/{self.wallet_count} 个地址")
                     print(f"⏱️  用时: {elapsed:.1f}秒")
                     print(f"🔢 尝试: {self.format_number(current_attempts)} 次")
-                    
+                
                     # 运气评价
                     ratio = current_attempts / probability if probability > 0 else 1
-                    
+                
                     if ratio < 0.5:
                         luck_msg = f"💎 恭喜！运气爆棚，仅用了理论值的 {ratio*100:.1f}%！"
                     elif ratio < 1.0:
                         luck_msg = f"👍 不错！运气还可以，快于平均速度。"
                     else:
                         luck_msg = f"💪 继续加油！下一个可能会更快。"
-                    
+                
                     print(luck_msg)
                     print()
                     
-                    # 如果已完成，停止所有进程
-                    if found_count >= self.wallet_count:
-                        stop_event.set()
-                        break
-                    
-                    # 继续下一轮
-                    break
-                    
+                    # 连续命中时走不到超时分支，这里也定期取走性能快照
+                    if time.time() - last_collect >= 1.0:
+                        self.collect_profiles()
+                        last_collect = time.time()
+                
                 except:
                     # 超时，显示进度
                     current_attempts = self.attempts.value
                     current_time = time.time()
-                    
+                
                     if current_time - last_time >= 1.0:  # 每1秒更新一次（减少开销）
+                        self.collect_profiles()
+                        last_collect = current_time
+                        self.writer.flush()
                         elapsed = current_time - self.start_time
-                        
+                    
                         # 计算速度
                         time_delta = current_time - last_time
                         if time_delta > 0 and current_attempts > last_attempts:
                             instant_speed = (current_attempts - last_attempts) / time_delta
                         else:
                             instant_speed = 0
-                        
+                    
                         # 只有速度大于0时才显示
                         if instant_speed > 100:  # 只显示有意义的速度
                             # 计算进度百分比
                             progress_pct = min(99.99, (current_attempts / probability * 100)) if probability > 0 else 0
-                            
+                        
                             # 生成进度条
                             progress_bar = self.get_progress_bar(progress_pct, 20)
-                            
+                        
                             # 计算预计剩余时间
                             if current_attempts < probability:
                                 remaining = probability - current_attempts
@@ -289,7 +1400,7 @@ class VanityGenerator:
                                 eta_str = self.format_time(eta)
                             else:
                                 eta_str = "随时可能"
-                            
+                        
                             # 构建输出（简化版，无运气提示）
                             output = (
                                 f"\r[{progress_bar}] "
@@ -298,17 +1409,23 @@ class VanityGenerator:
                                 f"速度: {self.format_number(instant_speed):>6s}/s | "
                                 f"预计: {eta_str:>8s}"
                             )
-                            
-                            print(output, end='', flush=True)
                         
+                            print(output, end='', flush=True)
+                    
                         last_attempts = current_attempts
                         last_time = current_time
-            
-            # 等待所有进程结束
-            for p in processes:
-                p.join(timeout=1)
-                if p.is_alive():
-                    p.terminate()
+        
+        finally:
+            # 通知所有进程退出（让它们提交计数和性能数据）
+            pending = []
+            self.stop_workers(processes, stop_event, queue, pending.append)
+            # 停止前已经找到、还在队列中的地址也保存下来
+            for private_key, address in pending[:self.wallet_count - found_count]:
+                found_count += 1
+                self.found_wallets.append((private_key, address))
+                self.save_wallet(private_key, address, found_count)
+                print(f"\n✅ 找到匹配地址: {address}")
+            self.writer.close()
         
         # 完成
         total_time = time.time() - self.start_time
@@ -318,26 +1435,30 @@ class VanityGenerator:
         print()
         print()
         print("=" * 70)
-        print("✨ 全部完成！")
+        print("⏹️  已停止" if self.terminating else "✨ 全部完成！")
         print("=" * 70)
         print(f"总用时:     {total_time:.1f} 秒 ({total_time/60:.1f} 分钟)")
         print(f"总尝试:     {self.format_number(total_attempts)} 次")
         print(f"平均速度:   {self.format_number(avg_speed)}/秒")
         print(f"生成数量:   {found_count} 个")
-        print(f"保存位置:   ultra_vanity_wallets.txt")
-        
-        # 整体运气评价
-        overall_ratio = total_attempts / (probability * self.wallet_count) if probability > 0 else 1
+        print(f"保存位置:   {self.output_file}")
+        if self.profile_sample:
+            self.report_profile()
         
+        # 整体运气评价（中途停止时没有意义）
         print()
-        if overall_ratio < 0.5:
-            print("🎊 恭喜！整体运气爆棚，远快于理论预期！")
-        elif overall_ratio < 1.0:
-            print("👍 不错！整体运气还可以，快于平均水平！")
-        elif overall_ratio < 1.5:
-            print("😊 正常水平，接近理论预期！")
+        if self.terminating:
+            print(f"⏹️  任务被停止，已保存 {found_count}/{self.wallet_count} 个地址")
         else:
-            print("💪 耐心点，好运还在后面！")
+            overall_ratio = total_attempts / (probability * self.wallet_count) if probability > 0 else 1
+            if overall_ratio < 0.5:
+                print("🎊 恭喜！整体运气爆棚，远快于理论预期！")
+            elif overall_ratio < 1.0:
+                print("👍 不错！整体运气还可以，快于平均水平！")
+            elif overall_ratio < 1.5:
+                print("😊 正常水平，接近理论预期！")
+            else:
+                print("💪 耐心点，好运还在后面！")
         
         print("=" * 70)
         print()
@@ -357,31 +1478,120 @@ def main():
     parser.add_argument('--case-sensitive', type=str, default='false', 
                         help='是否区分大小写 (true/false)')
     parser.add_argument('--count', type=int, default=1, help='生成数量')
-    parser.add_argument('--processes', type=int, default=None, 
-                        help='使用的进程数（默认为CPU核心数-1）')
+    parser.add_argument('--processes', type=str, default=None, 
+                        help='使用的进程数（默认为可用CPU数，auto为实测调优）')
+    parser.add_argument('--no-pin', action='store_true',
+                        help='不把工作进程绑定到CPU')
+    parser.add_argument('--tune-seconds', type=float, default=3.0,
+                        help='自动调优时每个候选的测量时间（秒）')
+    parser.add_argument('--detect-cpus', action='store_true',
+                        help='输出CPU拓扑（JSON）后退出')
+    parser.add_argument('--profile', type=int, nargs='?', const=64, default=0,
+                        metavar='N', help='性能分析：每N次尝试采样计时一次（默认64）')
+    parser.add_argument('--profile-dir', type=str, default=None,
+                        help='同时用cProfile分析，每个进程写出一个pstats文件到此目录')
+    parser.add_argument('--pid-file', type=str, default=None,
+                        help='在独立进程组中运行，并把进程组ID写入此文件（供后端停止任务）')
+    parser.add_argument('--check-deps', action='store_true',
+                        help='检查依赖能否导入后退出')
+    parser.add_argument('--version', action='version', version=f'%(prog)s {__version__}')
+    parser.add_argument('--pattern', type=str, default='',
+                        help='高级规则，分号分隔，例如 "zeros:4;repeat-tail:6"')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='只测量规则匹配开销，不生成地址')
+    parser.add_argument('--score', type=str, default=None,
+                        help=f"评分模式，寻找得分最高的地址（{', '.join(SCORERS)}）")
+    parser.add_argument('--time-budget', type=str, default='10m',
+                        help='评分模式的时间预算，例如 90、10m、1h（默认10m）')
+    parser.add_argument('--top', type=int, default=10,
+                        help='评分模式保留的地址数量（默认10）')
+    parser.add_argument('--format', type=str, default='text', choices=RESULT_FORMATS,
+                        help='结果文件格式: text、jsonl 或 csv（默认text）')
     
     args = parser.parse_args()
     
-    # 验证至少有一个条件
-    if not args.prefix and not args.suffix and not args.contains:
-        print("❌ 错误: 至少需要设置一个条件（--prefix、--suffix 或 --contains）")
+    if args.detect_cpus:
+        print(json.dumps(detect_cpu_topology()))
+        return
+    
+    if args.pid_file:
+        # 成为进程组组长，工作进程继承该组；停止时只需向这个组发送信号
+        if hasattr(os, 'setpgid'):
+            try:
+                os.setpgid(0, 0)
+            except OSError:
+                pass  # 已经是会话组长（例如由sshd直接启动）
+        with open(args.pid_file, 'w') as f:
+            f.write(f"{os.getpgrp() if hasattr(os, 'getpgrp') else os.getpid()}\n")
+    
+    start = time.perf_counter()
+    try:
+        load_crypto()
+    except ImportError as e:
+        print(f"❌ 错误: 缺少依赖（{e}），请先执行 pip3 install -r requirements.txt")
+        sys.exit(1)
+    
+    if args.check_deps:
+        print(f"✅ 依赖可用 (v{__version__}, 导入 {(time.perf_counter() - start) * 1000:.0f} ms)")
+        return
+    
+    auto_tune = args.processes == 'auto'
+    try:
+        processes = None if auto_tune or not args.processes else int(args.processes)
+    except ValueError:
+        print(f"❌ 错误: --processes 必须是整数或 auto: {args.processes}")
+        sys.exit(1)
+    
+    # 验证至少有一个条件（评分模式下条件是可选的过滤器）
+    if not args.score and not args.prefix and not args.suffix and not args.contains and not args.pattern:
+        print("❌ 错误: 至少需要设置一个条件（--prefix、--suffix、--contains、--pattern 或 --score）")
         sys.exit(1)
     
     # 转换case_sensitive
     case_sensitive = args.case_sensitive.lower() == 'true'
     
     # 创建生成器
-    generator = VanityGenerator(
-        prefix=args.prefix,
-        suffix=args.suffix,
-        contains=args.contains,
-        case_sensitive=case_sensitive,
-        wallet_count=args.count,
-        processes=args.processes
-    )
+    try:
+        generator = VanityGenerator(
+            prefix=args.prefix,
+            suffix=args.suffix,
+            contains=args.contains,
+            case_sensitive=case_sensitive,
+            wallet_count=args.count,
+            processes=processes,
+            pattern=args.pattern,
+            score=args.score,
+            time_budget=parse_duration(args.time_budget) if args.score else None,
+            top_k=max(1, args.top),
+            pin=not args.no_pin,
+            profile_sample=max(0, args.profile) or (64 if args.profile_dir else 0),
+            profile_dir=args.profile_dir,
+            result_format=args.format
+        )
+    except (ValueError, OSError) as e:
+        print(f"❌ 错误: {e}")
+        sys.exit(1)
+    
+    if args.benchmark:
+        generate_cost, match_cost = generator.benchmark()
+        print(f"地址生成: {generate_cost * 1e6:.2f} 微秒/次")
+        print(f"规则匹配: {match_cost * 1e6:.3f} 微秒/次")
+        print(f"额外开销: {match_cost / generate_cost * 100:.2f}%")
+        return
+    
+    # 停止信号：保存已找到的地址、提交计数后正常退出
+    signal.signal(signal.SIGTERM, generator.request_stop)
+    signal.signal(signal.SIGINT, generator.request_stop)
     
     # 运行
     try:
+        if auto_tune:
+            generator.processes = generator.tune_processes(args.tune_seconds)
+            # 供Web后端解析的调优结果
+            print(f"[CPU_TUNED] {generator.processes}", flush=True)
+        if generator.terminating:
+            print("\n⏹️  已停止")
+            return
         generator.run()
     except KeyboardInterrupt:
         print(f"\n\n⚠️  用户中断")
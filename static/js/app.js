@@ -8,8 +8,10 @@ let serverInfo = null;
 
 // 页面加载完成
 document.addEventListener('DOMContentLoaded', function() {
+    initTerminal();
     initSocketIO();
     loadSavedConfig();
+    loadResultList();
 });
 
 // 初始化WebSocket
@@ -40,12 +42,22 @@ function initSocketIO() {
             updateStatus('任务已停止', 'warning');
             hideStopButton();
             currentTaskId = null;
+            // 停止前找到的地址已同步，可以下载或导出
+            loadResultList();
         }
     });
 
     socket.on('generation_output', function(data) {
-        addTerminalLine(data.output);
-        scrollToBottom();
+        writeTerminal(data.output);
+    });
+
+    socket.on('cpu_tuned', function(data) {
+        if (data.task_id === currentTaskId) {
+            addTerminalLine(`🧮 自动调优选择 ${data.processes} 个进程`, 'success');
+            const cpuSlider = document.getElementById('cpu-slider');
+            cpuSlider.value = data.processes;
+            updateCPUValue(data.processes);
+        }
     });
 
     socket.on('task_completed', function(data) {
@@ -53,8 +65,12 @@ function initSocketIO() {
         updateStatus('✅ 生成完成！', 'success');
         showDownloadSection();
         addTerminalLine('\n🎉 任务完成！您可以下载结果文件。', 'success');
+        if (data.profile_url) {
+            addTerminalLine(`🔬 性能报告: ${window.location.origin}${data.profile_url}`, 'success');
+        }
         hideStopButton();
         currentTaskId = null;
+        loadResultList();
     });
 
     socket.on('task_error', function(data) {
@@ -102,7 +118,12 @@ function handleConnectionResult(data) {
         
         // 显示服务器信息
         document.getElementById('server-info').style.display = 'block';
-        document.getElementById('cpu-cores').textContent = `${data.cpu_cores} 核`;
+        let coresText = `${data.cpu_cores} 核`;
+        if (data.cpu_topology) {
+            const topo = data.cpu_topology;
+            coresText += ` (物理 ${topo.physical} / 逻辑 ${topo.logical})`;
+        }
+        document.getElementById('cpu-cores').textContent = coresText;
         document.getElementById('memory').textContent = `${data.memory_gb} GB`;
         document.getElementById('python-version').textContent = data.python_version;
 
@@ -118,7 +139,15 @@ function handleConnectionResult(data) {
 
         updateStatus('✅ 连接成功，可以开始生成', 'success');
         addTerminalLine(`✅ 连接成功！`, 'success');
-        addTerminalLine(`   CPU: ${data.cpu_cores} 核`, 'success');
+        addTerminalLine(`   CPU: ${data.cpu_cores} 核可用`, 'success');
+        if (data.cpu_topology) {
+            const topo = data.cpu_topology;
+            let detail = `   拓扑: 逻辑 ${topo.logical} / 物理 ${topo.physical} / NUMA ${topo.numa_nodes}`;
+            if (topo.cgroup_quota) {
+                detail += ` / 配额 ${topo.cgroup_quota.toFixed(1)}`;
+            }
+            addTerminalLine(detail, 'success');
+        }
         addTerminalLine(`   内存: ${data.memory_gb} GB`, 'success');
         addTerminalLine(`   Python: ${data.python_version}`, 'success');
         addTerminalLine(`   系统: ${data.os_info}\n`, 'success');
@@ -136,18 +165,22 @@ function startGeneration() {
     const prefix = document.getElementById('prefix').value.trim();
     const suffix = document.getElementById('suffix').value.trim();
     const contains = document.getElementById('contains').value.trim();
+    const pattern = document.getElementById('pattern').value.trim();
     const caseSensitive = document.getElementById('case-sensitive').checked;
     const walletCount = parseInt(document.getElementById('wallet-count').value) || 1;
     const cpuCores = parseInt(document.getElementById('cpu-slider').value);
+    const autoTune = document.getElementById('auto-tune').checked;
+    const profile = document.getElementById('profile').checked;
+    const resultFormat = document.getElementById('result-format').value;
 
     // 验证至少有一个条件
-    if (!prefix && !suffix && !contains) {
-        alert('请至少设置一个条件（前缀、后缀或包含）！');
+    if (!prefix && !suffix && !contains && !pattern) {
+        alert('请至少设置一个条件（前缀、后缀、包含或高级规则）！');
         return;
     }
 
     // 确认开始
-    const confirmMsg = `确认开始生成？\n\n前缀: ${prefix || '(无)'}\n后缀: ${suffix || '(无)'}\n包含: ${contains || '(无)'}\n数量: ${walletCount} 个\n核心: ${cpuCores} 核`;
+    const confirmMsg = `确认开始生成？\n\n前缀: ${prefix || '(无)'}\n后缀: ${suffix || '(无)'}\n包含: ${contains || '(无)'}\n规则: ${pattern || '(无)'}\n数量: ${walletCount} 个\n核心: ${autoTune ? '自动调优' : cpuCores + ' 核'}`;
     
     if (!confirm(confirmMsg)) {
         return;
@@ -169,9 +202,13 @@ function startGeneration() {
         prefix: prefix,
         suffix: suffix,
         contains: contains,
+        pattern: pattern,
         case_sensitive: caseSensitive,
         wallet_count: walletCount,
-        cpu_cores: cpuCores
+        cpu_cores: cpuCores,
+        auto_tune: autoTune,
+        profile: profile,
+        result_format: resultFormat
     });
 }
 
@@ -180,26 +217,185 @@ function updateCPUValue(value) {
     document.getElementById('cpu-value').textContent = value;
 }
 
+// ========== 终端 ==========
+// 输出保存在固定容量的环形缓冲区中，只渲染可见区域的行，
+// 同一动画帧内的多次输出合并为一次渲染。\r 开头的进度输出覆盖当前行，
+// 因此无论任务运行多久，DOM节点数和每帧开销都保持不变。
+
+const TERMINAL_MAX_LINES = 5000;   // 最多保留的行数
+const TERMINAL_OVERSCAN = 10;      // 可见区域上下额外渲染的行数
+
+const terminalState = {
+    lines: new Array(TERMINAL_MAX_LINES),
+    start: 0,            // 环形缓冲区中最旧一行的位置
+    length: 0,
+    current: null,       // 尚未换行的当前行 {text, className}
+    carriage: false,     // 收到 \r，下一段文本覆盖当前行
+    lineHeight: 0,
+    follow: true,        // 是否自动滚动到底部
+    renderPending: false,
+    pool: []             // 复用的行节点
+};
+
+// 初始化终端
+function initTerminal() {
+    const terminal = document.getElementById('terminal');
+    const probe = document.createElement('div');
+    probe.className = 'terminal-line';
+    probe.textContent = ' ';
+    document.getElementById('terminal-window').appendChild(probe);
+    terminalState.lineHeight = probe.offsetHeight || 18;
+    probe.remove();
+
+    terminal.addEventListener('scroll', function() {
+        // 用户向上滚动时停止跟随，回到底部后恢复
+        terminalState.follow = terminal.scrollTop + terminal.clientHeight >=
+            terminal.scrollHeight - terminalState.lineHeight * 2;
+        scheduleTerminalRender();
+    });
+
+    WELCOME_LINES.forEach(text => pushTerminalLine(text, 'welcome'));
+    scheduleTerminalRender();
+}
+
+const WELCOME_LINES = [
+    '欢迎使用 BSC靓号生成器 Web管理端！',
+    '请先配置左侧的服务器连接信息并测试连接。',
+    '',
+    '💡 使用说明:',
+    '1. 填写服务器IP、用户名和密码',
+    '2. 点击"测试连接"验证服务器',
+    '3. 设置生成参数（前缀、后缀、包含）',
+    '4. 调整CPU核心数（拖拽滑块）',
+    '5. 点击"开始生成"启动任务',
+    '',
+    '⚠️ 至少需要设置一个条件（前缀/后缀/包含/高级规则）'
+];
+
+// 追加一行到环形缓冲区（满了覆盖最旧的一行）
+function pushTerminalLine(text, className) {
+    const state = terminalState;
+    const line = { text: text, className: className };
+    if (state.length < TERMINAL_MAX_LINES) {
+        state.lines[(state.start + state.length) % TERMINAL_MAX_LINES] = line;
+        state.length++;
+    } else {
+        state.lines[state.start] = line;
+        state.start = (state.start + 1) % TERMINAL_MAX_LINES;
+        if (!state.follow) {
+            // 保持用户正在查看的内容不动
+            document.getElementById('terminal').scrollTop -= state.lineHeight;
+        }
+    }
+}
+
+// 结束当前行
+function commitCurrentLine() {
+    const state = terminalState;
+    if (state.current) {
+        pushTerminalLine(state.current.text, state.current.className);
+        state.current = null;
+    }
+    state.carriage = false;
+}
+
+// 写入原始输出（按终端语义处理 \n 和 \r）
+function writeTerminal(text, className = '') {
+    const state = terminalState;
+    text.split(/(\r\n|\r|\n)/).forEach(part => {
+        if (part === '\n' || part === '\r\n') {
+            if (!state.current) {
+                state.current = { text: '', className: className };
+            }
+            commitCurrentLine();
+        } else if (part === '\r') {
+            state.carriage = true;
+        } else if (part) {
+            if (!state.current || state.carriage) {
+                state.current = { text: part, className: className };
+            } else {
+                state.current.text += part;
+            }
+            state.carriage = false;
+        }
+    });
+    scheduleTerminalRender();
+}
+
 // 添加终端行
 function addTerminalLine(text, className = '') {
+    commitCurrentLine();
+    text.split('\n').forEach(line => pushTerminalLine(line, className));
+    scheduleTerminalRender();
+}
+
+// 下一动画帧渲染（同一帧内的多次输出只渲染一次）
+function scheduleTerminalRender() {
+    if (!terminalState.renderPending) {
+        terminalState.renderPending = true;
+        requestAnimationFrame(renderTerminal);
+    }
+}
+
+// 只渲染可见区域的行
+function renderTerminal() {
+    const state = terminalState;
+    state.renderPending = false;
     const terminal = document.getElementById('terminal');
-    const line = document.createElement('div');
-    line.className = `terminal-line ${className}`;
-    line.textContent = text;
-    terminal.appendChild(line);
-    scrollToBottom();
+    const spacer = document.getElementById('terminal-spacer');
+    const view = document.getElementById('terminal-window');
+    const lineHeight = state.lineHeight;
+    const total = state.length + (state.current ? 1 : 0);
+
+    spacer.style.height = `${total * lineHeight}px`;
+    if (state.follow) {
+        terminal.scrollTop = terminal.scrollHeight;
+    }
+
+    const first = Math.max(0, Math.floor(terminal.scrollTop / lineHeight) - TERMINAL_OVERSCAN);
+    const count = Math.min(total - first,
+        Math.ceil(terminal.clientHeight / lineHeight) + TERMINAL_OVERSCAN * 2);
+    view.style.transform = `translateY(${first * lineHeight}px)`;
+
+    while (state.pool.length < count) {
+        const node = document.createElement('div');
+        view.appendChild(node);
+        state.pool.push(node);
+    }
+    state.pool.forEach((node, i) => {
+        if (i >= count) {
+            node.style.display = 'none';
+            return;
+        }
+        const index = first + i;
+        const line = index < state.length
+            ? state.lines[(state.start + index) % TERMINAL_MAX_LINES]
+            : state.current;
+        const className = `terminal-line ${line.className}${line === state.current ? ' terminal-current' : ''}`;
+        if (node.textContent !== line.text) {
+            node.textContent = line.text;
+        }
+        if (node.className !== className) {
+            node.className = className;
+        }
+        node.style.display = '';
+    });
 }
 
 // 清空终端
 function clearTerminal() {
-    const terminal = document.getElementById('terminal');
-    terminal.innerHTML = '<div class="terminal-line welcome">终端已清空，等待新的输出...</div>';
+    terminalState.start = 0;
+    terminalState.length = 0;
+    terminalState.current = null;
+    terminalState.carriage = false;
+    terminalState.follow = true;
+    addTerminalLine('终端已清空，等待新的输出...', 'welcome');
 }
 
 // 滚动到底部
 function scrollToBottom() {
-    const terminal = document.getElementById('terminal');
-    terminal.scrollTop = terminal.scrollHeight;
+    terminalState.follow = true;
+    scheduleTerminalRender();
 }
 
 // 更新状态
@@ -237,6 +433,53 @@ function downloadResult() {
     }
 }
 
+// ========== 批量导出 ==========
+
+// 加载结果文件列表
+function loadResultList() {
+    fetch('/api/results')
+        .then(response => response.json())
+        .then(results => {
+            const list = document.getElementById('export-list');
+            list.innerHTML = '';
+            if (results.length === 0) {
+                list.innerHTML = '<small>暂无结果文件</small>';
+                return;
+            }
+            results.reverse().forEach(item => {
+                const label = document.createElement('label');
+                const checkbox = document.createElement('input');
+                checkbox.type = 'checkbox';
+                checkbox.value = item.task_id;
+                label.appendChild(checkbox);
+                label.appendChild(document.createTextNode(
+                    ` ${item.file} (${(item.size / 1024).toFixed(1)} KB, ${item.modified})`));
+                list.appendChild(label);
+            });
+        })
+        .catch(e => console.error('加载结果列表失败:', e));
+}
+
+// 全选结果
+function selectAllResults() {
+    document.querySelectorAll('#export-list input[type="checkbox"]').forEach(checkbox => {
+        checkbox.checked = true;
+    });
+}
+
+// 导出选中的结果（服务器流式生成归档，支持断点续传）
+function exportResults() {
+    const tasks = Array.from(document.querySelectorAll('#export-list input:checked'))
+        .map(checkbox => checkbox.value);
+    if (tasks.length === 0) {
+        alert('请先选择要导出的结果！');
+        return;
+    }
+    const format = document.getElementById('export-format').value;
+    window.location.href = `/api/export?format=${format}&tasks=${encodeURIComponent(tasks.join(','))}`;
+    addTerminalLine(`\n📦 正在导出 ${tasks.length} 个结果 (${format})`, 'success');
+}
+
 // 保存配置到localStorage
 function saveConfig() {
     const config = {
@@ -281,10 +524,11 @@ function stopTask() {
         return;
     }
     
-    if (!confirm('确定要停止当前任务吗？停止后已生成的结果可能会丢失。')) {
+    if (!confirm('确定要停止当前任务吗？已找到的地址会保存到结果文件。')) {
         return;
     }
     
     socket.emit('stop_task', { task_id: currentTaskId });
     addTerminalLine('\n⚠️  正在停止任务...', 'warning');
+    updateStatus('正在停止...', 'warning');
 }